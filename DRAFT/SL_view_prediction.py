@@ -1,10 +1,15 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 import streamlit as st
-from prophet import Prophet
-from prophet.diagnostics import cross_validation, performance_metrics
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from forecasting import SeasonalForecaster
+
 # Title and Description
 st.title("Audience Engagement Predictor")
 st.markdown("Use historical data to predict future audience engagement.")
@@ -21,6 +26,19 @@ except Exception as e:
     st.error(f"Error loading data: {e}")
     st.stop()
 
+# Sidebar options
+st.sidebar.subheader("Prediction Settings")
+engine = st.sidebar.radio(
+    "Forecast engine", ["Fast (interactive)", "Prophet (accurate)"],
+    help="The fast engine fits a trend plus weekly/yearly Fourier terms in milliseconds; Prophet is slower but more thorough."
+)
+periods_input = st.sidebar.number_input(
+    "How many future days would you like to predict?", min_value=1, max_value=730, value=365
+)
+iqr_multiplier = st.sidebar.select_slider(
+    "Outlier rule (IQR multiplier, 0 keeps every point)", options=[0.0, 1.5, 3.0, 5.0], value=1.5
+)
+
 # Data preprocessing
 try:
     if "Video publish time" not in data.columns or "Views" not in data.columns:
@@ -33,24 +51,19 @@ try:
     data = data.dropna(subset=['ds', 'y'])
 
     # Remove outliers using the IQR method
-    Q1 = data['y'].quantile(0.25)
-    Q3 = data['y'].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-    data = data[(data['y'] >= lower_bound) & (data['y'] <= upper_bound)]
-
-    st.write("Outliers removed using IQR method.")
+    if iqr_multiplier:
+        Q1 = data['y'].quantile(0.25)
+        Q3 = data['y'].quantile(0.75)
+        IQR = Q3 - Q1
+        lower_bound = Q1 - iqr_multiplier * IQR
+        upper_bound = Q3 + iqr_multiplier * IQR
+        data = data[(data['y'] >= lower_bound) & (data['y'] <= upper_bound)]
+
+        st.write(f"Outliers removed using IQR method ({iqr_multiplier} x IQR).")
 except Exception as e:
     st.error(f"Error processing data: {e}")
     st.stop()
 
-# Sidebar options
-st.sidebar.subheader("Prediction Settings")
-periods_input = st.sidebar.number_input(
-    "How many future days would you like to predict?", min_value=1, max_value=730, value=365
-)
-
 # Display historical data
 st.subheader("Historical Data")
 if not data.empty:
@@ -65,7 +78,13 @@ else:
     st.stop()
 
 # Model training and prediction
-model = Prophet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
+if engine.startswith("Prophet"):
+    from prophet import Prophet
+    from prophet.diagnostics import cross_validation, performance_metrics
+
+    model = Prophet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
+else:
+    model = SeasonalForecaster(yearly_seasonality=True, weekly_seasonality=True)
 try:
     model.fit(data[['ds', 'y']])
     future = model.make_future_dataframe(periods=periods_input, freq='D')
@@ -84,7 +103,15 @@ forecast['yhat'] = forecast['yhat'].apply(lambda x: max(x, 0))
 st.subheader("Forecasted Views Over Time")
 try:
     fig1, ax1 = plt.subplots(figsize=(10, 6))
-    model.plot(forecast, ax=ax1)
+    if engine.startswith("Prophet"):
+        model.plot(forecast, ax=ax1)
+    else:
+        ax1.plot(data['ds'], data['y'], 'k.', label="Observed")
+        ax1.plot(forecast['ds'], forecast['yhat'], color='#0072B2', label="Forecast")
+        ax1.fill_between(forecast['ds'], forecast['yhat_lower'], forecast['yhat_upper'], color='#0072B2', alpha=0.2)
+        ax1.set_xlabel("ds")
+        ax1.set_ylabel("y")
+        ax1.legend()
     st.pyplot(fig1)
 except Exception as e:
     st.error(f"Error generating forecast plot: {e}")
@@ -92,24 +119,34 @@ except Exception as e:
 # Components plot
 st.subheader("Forecast Components")
 try:
-    fig2 = model.plot_components(forecast)
+    if engine.startswith("Prophet"):
+        fig2 = model.plot_components(forecast)
+    else:
+        components = [c for c in ("trend", "weekly", "yearly") if c in forecast.columns]
+        fig2, axes = plt.subplots(len(components), 1, figsize=(10, 3 * len(components)))
+        for ax, component in zip(np.atleast_1d(axes), components):
+            ax.plot(forecast['ds'], forecast[component], color='#0072B2')
+            ax.set_ylabel(component)
     st.pyplot(fig2)
 except Exception as e:
     st.error(f"Error generating components plot: {e}")
 
 # Cross-validation and performance metrics
 st.subheader("Model Performance Metrics")
-try:
-    df_cv = cross_validation(model, initial='730 days', period='180 days', horizon='365 days')
-    df_p = performance_metrics(df_cv)
-    st.write(df_p)
-
-    st.write("**Insights from Performance Metrics:**")
-    st.write("- MAE (Mean Absolute Error) gives the average magnitude of errors in the predictions.")
-    st.write("- RMSE (Root Mean Squared Error) is more sensitive to larger errors due to squaring.")
-    st.write("- Use these metrics to evaluate and improve the model.")
-except Exception as e:
-    st.error(f"Error during cross-validation: {e}")
+if not engine.startswith("Prophet"):
+    st.info("Cross-validation metrics are computed with the Prophet engine.")
+else:
+    try:
+        df_cv = cross_validation(model, initial='730 days', period='180 days', horizon='365 days')
+        df_p = performance_metrics(df_cv)
+        st.write(df_p)
+
+        st.write("**Insights from Performance Metrics:**")
+        st.write("- MAE (Mean Absolute Error) gives the average magnitude of errors in the predictions.")
+        st.write("- RMSE (Root Mean Squared Error) is more sensitive to larger errors due to squaring.")
+        st.write("- Use these metrics to evaluate and improve the model.")
+    except Exception as e:
+        st.error(f"Error during cross-validation: {e}")
 
 # Insights from forecast
 st.subheader("Insights from Future Forecast")
@@ -1,9 +1,31 @@
+import base64
+import io
+
 import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import plotly.express as px
 
+from anomalies import ANOMALY_PATH, CHANNEL_METRICS
+from baselines import BASELINE_CHOICES, BaselineEngine
+from batch_forecast import FORECAST_PATH
+from category_model import load_or_train
+from cohorts import PublishCohorts
+from compaction import compact
+from exports import EXPORT_FORMATS, export, frame_batches
+from derived_metrics import RATIOS, evaluate
+from demographics import DIMENSIONS, METRICS, DemographicCube
+from geo_rollup import LEVELS, GeoRollup
+from datasets import DataSource, content_version, dataset_urls, fetch
+from series_index import SeriesIndex
+from subscription_series import ROLLUPS, SubscriptionSeries
+from snapshot_diff import DIFF_DATASETS, diff_snapshots
+from snapshots import SNAPSHOT_ROOT, Snapshot, list_versions, serving_version
+from title_similarity import TitleSimilarity
+from video_index import VideoIndex
+import query_engine
+
 # Page Configuration
 st.set_page_config(page_title="YouTube Analytics & Insights", page_icon="📊", layout="wide")
 
@@ -29,15 +51,31 @@ st.markdown(
 st.markdown("<h1>📊 DangerTV Audience Insights Dashboard</h1>", unsafe_allow_html=True)
 
 # Helper Functions for Visualizations
-def plot_bar(data, x, y, title, palette, figsize=(10, 5), xlabel=None, ylabel=None):
+# Pixel width of the content column (see .block-container above)
+DISPLAY_WIDTH = 1000
+
+# Figures are rendered once per input at display size and persisted to disk as PNG data URLs,
+# which st.image hands to the browser as-is instead of decoding, resizing and re-encoding them
+def figure_url(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=DISPLAY_WIDTH / fig.get_figwidth())
+    plt.close(fig)
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+@st.cache_data(persist="disk")
+def render_bar(data, x, y, title, palette, figsize, xlabel, ylabel):
     fig, ax = plt.subplots(figsize=figsize)
     sns.barplot(data=data, x=x, y=y, palette=palette, ax=ax)
     ax.set_title(title, fontsize=14)
     if xlabel: ax.set_xlabel(xlabel)
     if ylabel: ax.set_ylabel(ylabel)
-    st.pyplot(fig)
+    return figure_url(fig)
 
-def plot_heatmap(data, index, value, title, cmap, figsize=(10, 6)):
+def plot_bar(data, x, y, title, palette, figsize=(10, 5), xlabel=None, ylabel=None):
+    st.image(render_bar(data, x, y, title, palette, figsize, xlabel, ylabel), use_container_width=True)
+
+@st.cache_data(persist="disk")
+def render_heatmap(data, index, value, title, cmap, figsize):
     fig, ax = plt.subplots(figsize=figsize)
     sns.heatmap(
         data.pivot_table(index=index, values=value, aggfunc="sum"),
@@ -49,7 +87,32 @@ def plot_heatmap(data, index, value, title, cmap, figsize=(10, 6)):
         ax=ax,
     )
     ax.set_title(title, fontsize=14)
-    st.pyplot(fig)
+    return figure_url(fig)
+
+def plot_heatmap(data, index, value, title, cmap, figsize=(10, 6)):
+    st.image(render_heatmap(data, index, value, title, cmap, figsize), use_container_width=True)
+
+@st.cache_data(persist="disk")
+def render_matrix(matrix, label, title, cmap, figsize):
+    fig, ax = plt.subplots(figsize=figsize)
+    sns.heatmap(matrix, cmap=cmap, annot=True, fmt=".0f", linewidths=0.5, cbar_kws={"label": label}, ax=ax)
+    ax.set_title(title, fontsize=14)
+    return figure_url(fig)
+
+def plot_matrix(matrix, label, title, cmap, figsize=(10, 6)):
+    # Heatmap of an already pivoted table
+    st.image(render_matrix(matrix, label, title, cmap, figsize), use_container_width=True)
+
+def add_baseline(fig, baseline, annotation):
+    # A scalar baseline is drawn as a horizontal line, a per-weekday baseline as a dashed trace
+    if isinstance(baseline, pd.Series):
+        fig.add_scatter(x=baseline.index, y=baseline.values, mode="lines+markers", name="Same-weekday baseline",
+            line={"dash": "dash", "color": "red"})
+    else:
+        fig.add_hline(y=baseline, line_dash="dash", line_color="red",
+            annotation_text=annotation.format(baseline), annotation_position="bottom right")
+
+DATA_VERSION_TTL = 600
 
 # Tabs for Navigation
 tabs = st.tabs([
@@ -58,20 +121,183 @@ tabs = st.tabs([
     "📊 DangerTV Programming Strategy"
 ])
 
-# Data Loading Functions
+# Content hash of each export, re-checked every few minutes so data behind an unpinned URL never goes stale
+@st.cache_data(ttl=DATA_VERSION_TTL, show_spinner=False)
+def data_version(url):
+    return content_version(fetch(url))
+
+# Data Loading Functions (persisted to disk and pre-filled by warmup.py before the server starts).
+# Loaders take a DataSource, so every cache below is keyed on the export's content hash as well as its URL.
+@st.cache_data(persist="disk")
+def load_csv(source):
+    return pd.read_csv(source.url)
+
+@st.cache_data(persist="disk")
+def load_strategy_data(url):
+    data = load_csv(url)
+    data["Date"] = pd.to_datetime(data["Date"])
+    data["Day of Week"] = data["Date"].dt.day_name()
+    return data
+
+# Shared across sessions and keyed on the data source, so it is built once per dataset version
+@st.cache_resource
+def load_video_index(url):
+    return VideoIndex(load_strategy_data(url))
+
+# Compacted straight after parsing so only the small dtypes stay cached
+@st.cache_data(persist="disk")
+def load_compact_csv(source):
+    return compact(pd.read_csv(source.url))
+
+# Loaded from artifacts/models when this catalog has been trained on before, so it is only fitted once
+@st.cache_resource
+def load_category_model(content_url, snapshot_version=None):
+    content = load_snapshot(snapshot_version).frame("content") if snapshot_version else load_compact_csv(content_url)
+    return load_or_train(content["Video title"])
+
+def with_model_categories(content, model):
+    return content.assign(**{query_engine.MODEL_CATEGORY: model.predict(content["Video title"])})
+
+# DuckDB views over the content and city exports, shared by every session
+@st.cache_resource
+def load_query_engine(content_url, cities_url, learned_categories=False):
+    content = load_compact_csv(content_url)
+    if learned_categories:
+        content = with_model_categories(content, load_category_model(content_url))
+    return query_engine.QueryEngine({"content": content, "cities": load_compact_csv(cities_url)})
+
+# Keyed on the published version, so a new snapshot is picked up atomically on the next rerun
+@st.cache_resource
+def load_snapshot(version):
+    return Snapshot(SNAPSHOT_ROOT / version)
+
+# Snapshots are immutable, so a diff is computed once per (old, new, dataset)
+@st.cache_resource
+def load_snapshot_diff(old_version, new_version, dataset):
+    return diff_snapshots(old_version, new_version, dataset)
+
+@st.cache_resource
+def load_snapshot_query_engine(version, learned_categories=False):
+    snapshot = load_snapshot(version)
+    content = snapshot.frame("content").drop(columns=["Category", "Publish date"])
+    if learned_categories:
+        content = with_model_categories(content, load_category_model(None, version))
+    return query_engine.QueryEngine({"content": content, "cities": snapshot.frame("cities")})
+
+@st.cache_resource
+def load_demographic_cube(age_url, gender_url, subscriptions_url, snapshot_version=None):
+    if snapshot_version:
+        snapshot = load_snapshot(snapshot_version)
+        return DemographicCube(*(snapshot.frame(name) for name in ("age", "gender", "subscriptions")))
+    return DemographicCube(load_csv(age_url), load_csv(gender_url), load_csv(subscriptions_url))
+
+@st.cache_resource
+def load_subscription_series(url, snapshot_version=None):
+    daily = load_snapshot(snapshot_version).frame("subscription_daily") if snapshot_version else load_csv(url)
+    return SubscriptionSeries(daily)
+
+@st.cache_resource
+def load_geo_rollup(url, snapshot_version=None):
+    cities = load_snapshot(snapshot_version).frame("cities") if snapshot_version else load_compact_csv(url)
+    return GeoRollup(cities)
+
+@st.cache_resource
+def load_series_index(url, snapshot_version=None):
+    content = load_snapshot(snapshot_version).frame("content") if snapshot_version else load_compact_csv(url)
+    return SeriesIndex(content)
+
+# Per-video derived metrics, evaluated in one pass per dataset version
+@st.cache_resource
+def load_video_metrics(url, snapshot_version=None):
+    content = load_snapshot(snapshot_version).frame("content") if snapshot_version else load_compact_csv(url)
+    return evaluate(content)
+
+# One index for the life of the server: each rerun only adds titles it has not seen yet
+@st.cache_resource
+def load_title_similarity():
+    return TitleSimilarity()
+
+# Once per dataset version: the shared index takes that version's new titles and compares only those
+@st.cache_resource(show_spinner=False)
+def load_duplicates(content_key, _titles):
+    title_similarity = load_title_similarity()
+    title_similarity.add(_titles)
+    return title_similarity.duplicates()
+
+@st.cache_resource
+def load_baselines(url):
+    return BaselineEngine(load_strategy_data(url))
+
+@st.cache_resource
+def load_cohorts(url):
+    return PublishCohorts(load_strategy_data(url))
+
+# Written by batch_forecast.py; the modification time keys the cache so a new run is picked up
 @st.cache_data
-def load_csv(url):
-    return pd.read_csv(url)
-
-# URLs for datasets
-urls = {
-    "age": "https://raw.githubusercontent.com/violetzq/MYCOMM599/028782a8bd347b54aa1c748cd8c985e8b1d39645/viewer_age.csv",
-    "gender": "https://raw.githubusercontent.com/violetzq/MYCOMM599/main/Viewer_gender.csv",
-    "cities": "https://raw.githubusercontent.com/violetzq/MYCOMM599/main/Viewer_Cities.csv",
-    "subscriptions": "https://raw.githubusercontent.com/violetzq/MYCOMM599/main/Subscription_status.csv",
-    "content": "https://raw.githubusercontent.com/violetzq/MYCOMM599/main/DangerTV_Content.csv",
-    "strategy": "https://raw.githubusercontent.com/violetzq/MYCOMM599/919d85a4502a9906dafce8935dc413e86f8690c3/dates%20data.csv",
-}
+def load_forecasts(path, modified):
+    return pd.read_parquet(path)
+
+# Written by anomalies.py; keyed on the modification time like the forecasts
+@st.cache_data
+def load_anomalies(path, modified):
+    return pd.read_parquet(path)
+
+VIDEO_PAGE_SIZE = 50
+MIN_METRIC_VIEWS = 1000
+SEARCH_PAGE_SIZE = 25
+# Encoded exports are whole byte strings, so the server only holds a couple and drops them once idle
+EXPORT_CACHE_ENTRIES = 2
+EXPORT_CACHE_TTL = 300
+
+# Encoded once per (source, format) from the chunked encoders; reruns with the export ticked reuse the bytes.
+# Exports too large to hold in memory should go through api.py's streaming /export endpoint instead.
+@st.cache_data(max_entries=EXPORT_CACHE_ENTRIES, ttl=EXPORT_CACHE_TTL, show_spinner="Encoding export...")
+def encode_export(_batches_source, source_key, export_format, name):
+    return b"".join(export(_batches_source(), export_format, name))
+
+# Exports are only encoded once the user asks for one
+def export_download(label, batches_source, source_key, name, key):
+    if not st.checkbox(f"Export {label}", key=f"{key}_export"):
+        return
+    export_format = st.radio("Export format:", list(EXPORT_FORMATS), horizontal=True, key=f"{key}_format")
+    st.download_button(
+        label=f"Download {label} as {export_format.upper()}",
+        data=encode_export(batches_source, source_key, export_format, name),
+        file_name=f"{name}{EXPORT_FORMATS[export_format]['suffix']}",
+        mime=EXPORT_FORMATS[export_format]["mime"],
+        key=f"{key}_download",
+    )
+
+# Search results are counted, sorted and sliced in DuckDB; only the visible page reaches the browser
+def paged_search(engine, engine_key, kind, text, key):
+    match_count = query_engine.search_count(engine, kind, text)
+    if not match_count:
+        return 0
+    sort_column, order_column, page_column = st.columns(3)
+    order_by = sort_column.selectbox("Sort by:", query_engine.SEARCHES[kind]["sort"], key=f"{key}_sort")
+    descending = order_column.checkbox("Descending", value=True, key=f"{key}_descending")
+    page_count = -(-match_count // SEARCH_PAGE_SIZE)
+    page = page_column.number_input(f"Page (1-{page_count}, {match_count} matches):",
+        min_value=1, max_value=page_count, value=1, step=1, key=f"{key}_page")
+    st.dataframe(query_engine.search_page(engine, kind, text, order_by, descending, page, SEARCH_PAGE_SIZE),
+        hide_index=True, use_container_width=True)
+    sql = query_engine.search_sql(kind, order_by, descending)
+    export_download(f"all {match_count} matches", lambda: engine.batches(sql, [text]),
+        (engine_key, sql, text), f"{kind}_search", key)
+    return match_count
+
+# Dataset sources: URL and content hash (the checked-in CSVs when DANGERTV_LOCAL_DATA is set)
+urls = {name: DataSource(url, data_version(url)) for name, url in dataset_urls().items()}
+
+# Precomputed tables from snapshots.py when the current code has published one; otherwise computed live
+snapshot_version = serving_version()
+snapshot = load_snapshot(snapshot_version) if snapshot_version else None
+
+# Optional classifier in place of the keyword rules; the snapshot's category tables use the rules
+learned_categories = st.sidebar.toggle("Learned categories",
+    help="Label videos with a classifier trained from the keyword rules instead of the rules themselves.")
+# Identifies the query engine's data, for caches of results computed from it
+queries_key = (snapshot_version or (urls["content"], urls["cities"]), learned_categories)
 
 # Tab 1: YouTube Audience Insights
 with tabs[0]:
@@ -79,10 +305,14 @@ with tabs[0]:
 
     # Load Audience Data
     try:
-        age_data = load_csv(urls["age"])
-        gender_data = load_csv(urls["gender"])
-        cities_data = load_csv(urls["cities"])
-        subscription_data = load_csv(urls["subscriptions"])
+        if snapshot:
+            age_data, gender_data, subscription_data = (snapshot.frame(name) for name in ("age", "gender", "subscriptions"))
+            queries = load_snapshot_query_engine(snapshot_version, learned_categories)
+        else:
+            age_data = load_csv(urls["age"])
+            gender_data = load_csv(urls["gender"])
+            subscription_data = load_csv(urls["subscriptions"])
+            queries = load_query_engine(urls["content"], urls["cities"], learned_categories)
         gender_data = gender_data[gender_data["Viewer gender"] != "User-specified"]  # Clean gender data
     except Exception as e:
         st.error(f"Error loading data: {e}")
@@ -100,27 +330,76 @@ with tabs[0]:
     st.subheader("🔔 Subscription Status")
     plot_bar(subscription_data, "Subscription status", "Views", "Views by Subscription Status", "Set2")
 
+    # Daily views by subscription status: rollups and rolling shares are precomputed, ranges come from prefix sums
+    subscription_series = load_subscription_series(urls["subscription_daily"], snapshot_version)
+    series_first, series_last = subscription_series.dates[0].date(), subscription_series.dates[-1].date()
+    rollup_column, range_column = st.columns(2)
+    rollup_name = rollup_column.radio("Granularity:", list(ROLLUPS), index=1, horizontal=True)
+    subscription_range = range_column.date_input("Subscription date range:", (series_first, series_last),
+        min_value=series_first, max_value=series_last)
+    range_start, range_end = subscription_range if len(subscription_range) == 2 else (series_first, series_last)
+    range_totals = subscription_series.range_totals(range_start, range_end)
+    subscribed_metric, not_subscribed_metric, share_metric = st.columns(3)
+    subscribed_metric.metric("Subscribed views", f"{range_totals['Subscribed']:,.0f}")
+    not_subscribed_metric.metric("Not subscribed views", f"{range_totals['Not subscribed']:,.0f}")
+    share_metric.metric("Subscribed share", f"{range_totals['Subscribed share (%)']:.1f}%")
+
+    rollup = subscription_series.rollup(rollup_name, range_start, range_end)
+    fig_subscription = px.line(rollup, y=subscription_series.statuses,
+        title=f"{rollup_name} Views by Subscription Status", labels={"value": "Views", "variable": "Status"})
+    st.plotly_chart(fig_subscription, use_container_width=True)
+    shares = subscription_series.rolling_shares.loc[pd.Timestamp(range_start):pd.Timestamp(range_end)]
+    fig_shares = px.line(shares, title="Rolling Share of Views from Subscribers",
+        labels={"value": "Subscribed share (%)", "variable": "Window"})
+    st.plotly_chart(fig_shares, use_container_width=True)
+
+    # Demographic Cross-tab - absolute estimates from the percentage splits and subscription totals
+    st.subheader("👥 Audience Cross-tab")
+    cube = load_demographic_cube(urls["age"], urls["gender"], urls["subscriptions"], snapshot_version)
+    cross_rows, cross_columns, cross_metric = st.columns(3)
+    rows_dimension = cross_rows.selectbox("Rows:", DIMENSIONS, index=0)
+    columns_dimension = cross_columns.selectbox("Columns:", [d for d in DIMENSIONS if d != rows_dimension])
+    cube_metric = cross_metric.selectbox("Metric:", METRICS)
+    st.dataframe(cube.breakdown(cube_metric, by=(rows_dimension, columns_dimension)).round(0))
+    st.caption("Estimated cells assume age, gender and subscription splits are independent.")
+
     # Top Cities by Views
     st.subheader("🌆 Top Cities by Views")
-    top_cities = cities_data.sort_values(by="Views", ascending=False).head(10)
+    if snapshot:
+        top_cities_views, top_cities_watch_time = snapshot.frame("top_cities_views"), snapshot.frame("top_cities_watch_time")
+    else:
+        top_cities_views = query_engine.top_cities(queries, by="Views", limit=20)
+        top_cities_watch_time = query_engine.top_cities(queries, by="Watch time (hours)", limit=20)
+    top_cities = top_cities_views.head(10)
     plot_bar(top_cities, "Views", "City name", "Top 10 Cities by Views", "mako", xlabel="Views", ylabel="City")
 
     # Heatmaps
     st.subheader("🗺️ Heatmap of Views by City")
-    plot_heatmap(cities_data.sort_values(by="Views", ascending=False).head(20), "City name", "Views", "Views by City", "Blues")
+    plot_heatmap(top_cities_views.head(20), "City name", "Views", "Views by City", "Blues")
 
     st.subheader("⏱️ Heatmap of Watch Time by City")
-    plot_heatmap(cities_data.sort_values(by="Watch time (hours)", ascending=False).head(20), "City name", "Watch time (hours)", "Watch Time by City", "Greens")
+    plot_heatmap(top_cities_watch_time.head(20), "City name", "Watch time (hours)", "Watch Time by City", "Greens")
+
+    # Geographic Rollup - precomputed country/region/city totals with drill-down
+    st.subheader("🧭 Views by Country, Region and City")
+    geo = load_geo_rollup(urls["cities"], snapshot_version)
+    geo_level = st.radio("Level:", LEVELS, horizontal=True)
+    plot_bar(geo.top(geo_level, 10), "Views", "Location", f"Top 10 by {geo_level}", "mako", xlabel="Views", ylabel=geo_level)
+
+    drill_country = st.selectbox("Drill into a country:", geo.top("Country", len(geo.grouped["Country"]))["Country"].tolist())
+    if drill_country:
+        country_regions = geo.children("Region", (drill_country,))
+        st.write(country_regions.drop(columns=["Country", "Location"]))
+        drill_region = st.selectbox("Drill into a region:", country_regions["Region"].tolist())
+        if drill_region:
+            st.write(geo.children("City", (drill_country, drill_region)).drop(columns=["Country", "Region", "Location"]))
 
     # Geographic Location - Search Feature
     st.subheader("🌍 Search by City")
     city_search = st.text_input("Enter a City (e.g., New York, London):").strip()
     if city_search:
-        city_results = cities_data[cities_data["City name"].str.contains(city_search, case=False, na=False)]
-        if not city_results.empty:
-            st.write("**City Search Results:**")
-            st.write(city_results.drop(columns=["Cities"], errors="ignore"))
-        else:
+        st.write("**City Search Results:**")
+        if not paged_search(queries, queries_key, "cities", city_search, "city_search"):
             st.warning("No results found for the city.")
 
 # Tab 2: Content Performance Analysis
@@ -129,38 +408,17 @@ with tabs[1]:
 
     # Load Content Data
     try:
-        content_data = load_csv(urls["content"])
+        if snapshot:
+            queries = load_snapshot_query_engine(snapshot_version, learned_categories)
+        else:
+            queries = load_query_engine(urls["content"], urls["cities"], learned_categories)
     except Exception as e:
         st.error(f"Error loading content data: {e}")
         st.stop()
 
-    # Assign Categories
-    categories = {
-        "Border Security": ["border", "customs", "security"],
-        "Wildlife": ["wildlife", "animal", "nature", "wild", "hunting", "bear"],
-        "Adventure": ["adventure", "journey", "explore", "trap", "wilderness", "weather", "severe", "survive", "climbing", "storm", "coast guard"],
-        "Crime": ["crime", "criminal", "police", "investigation", "drug", "jail", "sin"],
-        "Human Stories & Disaster": ["life", "story", "family", "personal", "survive", "tsunami", "earthquake", "tornado", "dead", "risk", "tribe"],
-        "Vehicles": ["car", "truck", "vehicle", "auto", "transport"],
-        "Maritime": ["ship", "boat", "ocean", "sea", "fish", "fishing", "sail", "sailor"],
-        "Bull Fight": ["bulls", "matadors"],
-        "Battle & Special Forces": ["battle", "war", "afghanistan", "training", "special forces", "rescue", "fight", "swat", "k-9"]
-    }
-
-    def assign_category(title):
-        for category, keywords in categories.items():
-            if any(keyword.lower() in str(title).lower() for keyword in keywords):
-                return category
-        return "Other"
-
-    content_data["Category"] = content_data["Video title"].apply(assign_category)
-
-    # Aggregate Data
-    category_summary = content_data.groupby("Category").agg({
-        "Views": "sum",
-        "Watch time (hours)": "sum",
-        "Impressions click-through rate (%)": "mean"
-    }).reset_index()
+    # Aggregate Data (categories are assigned inside the `content` view)
+    snapshot_categories = snapshot and not learned_categories
+    category_summary = snapshot.frame("category_summary") if snapshot_categories else query_engine.category_summary(queries)
 
     # Total Views by Category
     st.subheader("📊 Total Views by Category")
@@ -171,51 +429,133 @@ with tabs[1]:
     most_viewed = category_summary.loc[category_summary["Views"].idxmax()]
     highest_ctr = category_summary.loc[category_summary["Impressions click-through rate (%)"].idxmax()]
     st.write(f"- **Most viewed category:** {most_viewed['Category']} with {most_viewed['Views']:.0f} views.")
-    st.write(f"- **Highest average CTR:** {highest_ctr['Category']} with {highest_ctr['Impressions click-through rate (%)']:.2f}% CTR.")
+    st.write(f"- **Highest CTR:** {highest_ctr['Category']} with {highest_ctr['Impressions click-through rate (%)']:.2f}% CTR.")
+
+    # Derived metrics: ratio-of-sums per category, per-video values from the metric registry
+    st.subheader("📐 Efficiency Metrics")
+    ratio_metrics = [metric for metric in RATIOS if metric in category_summary]
+    efficiency_metric = st.selectbox("Efficiency metric:", ratio_metrics)
+    if efficiency_metric:
+        plot_bar(category_summary, efficiency_metric, "Category", f"{efficiency_metric} by Category", "mako",
+            xlabel=efficiency_metric, ylabel="Category")
+        video_metrics = load_video_metrics(urls["content"], snapshot_version)
+        established = video_metrics[video_metrics["Views"] >= MIN_METRIC_VIEWS]
+        st.write(f"Top videos by {efficiency_metric} (at least {MIN_METRIC_VIEWS:,} views):")
+        st.write(established.nlargest(10, efficiency_metric)[["Video title", "Views", efficiency_metric]])
+
+    # Batch Forecasts
+    if FORECAST_PATH.exists():
+        st.subheader("🔮 Category Forecasts")
+        forecasts = load_forecasts(str(FORECAST_PATH), FORECAST_PATH.stat().st_mtime)
+        forecast_group = st.selectbox("Select a Forecast:", forecasts["group"].unique().tolist())
+        if forecast_group:
+            group_forecast = forecasts[forecasts["group"] == forecast_group]
+            fig_forecast = px.line(group_forecast, x="ds", y=["yhat", "yhat_lower", "yhat_upper"],
+                title=f"Forecasted Views for {forecast_group}", labels={"ds": "Date", "value": "Views"})
+            st.plotly_chart(fig_forecast, use_container_width=True)
+
+    # Series Performance (series, season and episode parsed from the titles once per dataset version)
+    st.subheader("📺 Series Performance")
+    series_index = load_series_index(urls["content"], snapshot_version)
+    plot_bar(series_index.top(10), "Views", "Series", "Top 10 Series by Views", "crest", xlabel="Total Views", ylabel="Series")
+    selected_series = st.selectbox("Select a Series:", series_index.names)
+    if selected_series:
+        season_trend = series_index.season_trend(selected_series)
+        if len(season_trend) > 1:
+            fig_seasons = px.line(season_trend, x="Season", y="Views per video", markers=True,
+                title=f"Views per Episode by Season: {selected_series}")
+            st.plotly_chart(fig_seasons, use_container_width=True)
+        st.write(series_index.episodes_of(selected_series)[
+            ["Rank", "Episode title", "Season", "Episode", "Views", "Watch time (hours)", "Impressions click-through rate (%)"]])
 
     # Top Videos by Category
     st.subheader("🎬 Top Videos by Category")
     selected_category = st.selectbox("Select a Category:", category_summary["Category"].tolist())
     if selected_category:
-        top_videos = content_data[content_data["Category"] == selected_category].sort_values(by="Views", ascending=False).head(10)
-        st.write(top_videos[["Video title", "Views", "Watch time (hours)", "Impressions click-through rate (%)"]])
+        if snapshot_categories:
+            top_videos = snapshot.frame("top_videos")
+            top_videos = top_videos[top_videos["Category"] == selected_category].drop(columns="Category")
+        else:
+            top_videos = query_engine.top_videos(queries, selected_category, limit=10)
+        st.write(top_videos)
 
     # Search for Videos
     st.subheader("🔍 Search for a Specific Video")
     video_search = st.text_input("Enter a video title or keyword:")
     if video_search:
-        search_results = content_data[content_data["Video title"].str.contains(video_search, case=False, na=False)]
-        if not search_results.empty:
-            st.write("Search Results:")
-            st.write(search_results[["Video title", "Category", "Views", "Watch time (hours)", "Impressions click-through rate (%)"]])
-        else:
+        st.write("Search Results:")
+        if not paged_search(queries, queries_key, "videos", video_search, "video_search"):
             st.warning("No results found.")
 
+    # Near-duplicate titles: re-uploads and multi-part episodes whose views are split across entries
+    st.subheader("🔁 Possible Duplicates")
+    video_views = queries.query('SELECT "Video title", "Views" FROM content')
+    duplicates = load_duplicates(snapshot_version or urls["content"], video_views["Video title"])
+    if duplicates.empty:
+        st.write("No near-duplicate titles found.")
+    else:
+        duplicates = duplicates.merge(video_views.groupby("Video title", as_index=False)["Views"].sum(), on="Video title")
+        duplicate_summary = duplicates.groupby("Cluster").agg(
+            Titles=("Video title", "size"), Views=("Views", "sum"), Example=("Video title", "first"))
+        st.write(duplicate_summary.sort_values("Views", ascending=False).reset_index(drop=True))
+
+    # What Moved since an earlier published snapshot
+    previous_versions = [version for version in list_versions() if snapshot_version and version < snapshot_version]
+    if previous_versions:
+        st.subheader("📦 What Moved")
+        diff_old_column, diff_dataset_column, diff_metric_column = st.columns(3)
+        diff_old = diff_old_column.selectbox("Compare with snapshot:", previous_versions[::-1])
+        diff_dataset = diff_dataset_column.selectbox("Dataset:", list(DIFF_DATASETS))
+        diff = load_snapshot_diff(diff_old, snapshot_version, diff_dataset)
+        diff_metric = diff_metric_column.selectbox("Moved metric:", diff.metrics)
+        st.write(diff.summary())
+        gains_column, losses_column = st.columns(2)
+        gains_column.write("Top gains:")
+        gains_column.write(diff.movers(diff_metric, 10, "up"))
+        losses_column.write("Top losses:")
+        losses_column.write(diff.movers(diff_metric, 10, "down"))
+        for status in ("added", "removed"):
+            changed_entities = diff.status(status)
+            if not changed_entities.empty:
+                st.write(f"{status.capitalize()} ({len(changed_entities)}):")
+                st.write(changed_entities[[diff.key, diff.label, f"{diff_metric} (delta)"]])
+
 # Tab 3: DangerTV Programming Strategy
 with tabs[2]:
     st.header("📊 DangerTV Programming Strategy Insights")
     
     # Load Strategy Data
     try:
-        data = load_csv(urls["strategy"])
+        data = load_strategy_data(urls["strategy"])
     except Exception as e:
         st.error(f"Error loading strategy data: {e}")
         st.stop()
 
-    data["Date"] = pd.to_datetime(data["Date"])
-    data["Day of Week"] = data["Date"].dt.day_name()
+    baselines = load_baselines(urls["strategy"])
 
-    # Baselines
-    baseline_views = data["Views"].mean()
+    # Baselines: global means for the per-video table, engine lookups for the daily channel metrics
     baseline_video_views = data["Video views"].mean()
-    baseline_watch_time = data["Watch time (hours)"].mean()
     baseline_video_revenue = data["Video estimated revenue (USD)"].mean()
-    baseline_estimated_revenue = data["Estimated revenue (USD)"].mean()
+    baseline_video_watch_time = baselines.range_mean("Watch time (hours)")
+
+    first_day, last_day = baselines.dates[0].date(), baselines.dates[-1].date()
+    date_range = st.date_input("Date range:", (first_day, last_day), min_value=first_day, max_value=last_day)
+    range_start, range_end = date_range if len(date_range) == 2 else (first_day, last_day)
+    baseline_kind = BASELINE_CHOICES[st.selectbox("Baseline:", list(BASELINE_CHOICES))]
+
+    def metric_baseline(metric):
+        if baseline_kind == "weekday":
+            return baselines.weekday_baselines(metric, range_end)
+        if baseline_kind == "all":
+            return baselines.range_mean(metric, range_start, range_end)
+        return baselines.baseline(metric, baseline_kind, range_end)
+
+    baseline_views = metric_baseline("Views")
+    baseline_watch_time = metric_baseline("Watch time (hours)")
+    baseline_estimated_revenue = metric_baseline("Estimated revenue (USD)")
 
     # Day of Week Analysis
-    average_metrics_day = data.groupby("Day of Week")[["Views", "Watch time (hours)", "Estimated revenue (USD)"]].mean().reindex(
-        ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    )
+    average_metrics_day = baselines.weekday_means(range_start, range_end)
 
     # Charts for Day of Week Analysis
     fig_views = px.bar(
@@ -226,8 +566,7 @@ with tabs[2]:
         labels={"x": "Day of Week", "Views": "Average Views"},
         text_auto=True
     )
-    fig_views.add_hline(y=baseline_views, line_dash="dash", line_color="red", 
-        annotation_text=f"Daily Views Baseline ({baseline_views:.0f})", annotation_position="bottom right")
+    add_baseline(fig_views, baseline_views, "Daily Views Baseline ({:.0f})")
     
     fig_watch_time = px.bar(
         average_metrics_day,
@@ -237,8 +576,7 @@ with tabs[2]:
         labels={"x": "Day of Week", "Watch time (hours)": "Average Watch Time (hours)"},
         text_auto=True
     )
-    fig_watch_time.add_hline(y=baseline_watch_time, line_dash="dash", line_color="red", 
-        annotation_text=f"Watch Time Baseline ({baseline_watch_time:.0f} hours)", annotation_position="bottom right")
+    add_baseline(fig_watch_time, baseline_watch_time, "Watch Time Baseline ({:.0f} hours)")
     
     fig_revenue = px.bar(
         average_metrics_day,
@@ -248,21 +586,65 @@ with tabs[2]:
         labels={"x": "Day of Week", "Estimated revenue (USD)": "Average Revenue (USD)"},
         text_auto=True
     )
-    fig_revenue.add_hline(y=baseline_estimated_revenue, line_dash="dash", line_color="red", 
-        annotation_text=f"Revenue Baseline (${baseline_estimated_revenue:.2f})", annotation_position="bottom right")
+    add_baseline(fig_revenue, baseline_estimated_revenue, "Revenue Baseline (${:.2f})")
 
     st.plotly_chart(fig_views, use_container_width=True)
     st.plotly_chart(fig_watch_time, use_container_width=True)
     st.plotly_chart(fig_revenue, use_container_width=True)
 
+    # Anomalies flagged by anomalies.py as each day is ingested; nothing is recomputed here
+    if ANOMALY_PATH.exists():
+        st.subheader("🚨 Spikes and Drops")
+        anomalies = load_anomalies(str(ANOMALY_PATH), ANOMALY_PATH.stat().st_mtime)
+        anomaly_metric = st.selectbox("Anomaly metric:", CHANNEL_METRICS)
+        channel_series = data.groupby("Date")[anomaly_metric].sum(min_count=1).dropna().loc[pd.Timestamp(range_start):pd.Timestamp(range_end)]
+        metric_flags = anomalies[(anomalies["series_type"] == "channel") & (anomalies["metric"] == anomaly_metric)
+            & anomalies["ds"].between(pd.Timestamp(range_start), pd.Timestamp(range_end))]
+        fig_anomalies = px.line(x=channel_series.index, y=channel_series.to_numpy(),
+            title=f"Daily {anomaly_metric} with Flagged Days", labels={"x": "Date", "y": anomaly_metric})
+        for flag, color in (("spike", "red"), ("drop", "orange")):
+            flagged = metric_flags[metric_flags["flag"] == flag]
+            fig_anomalies.add_scatter(x=flagged["ds"], y=flagged["value"], mode="markers", name=flag.capitalize(),
+                marker={"color": color, "size": 10})
+        st.plotly_chart(fig_anomalies, use_container_width=True)
+        st.write(metric_flags.sort_values("ds", ascending=False)[["ds", "value", "expected", "z", "flag"]])
+        video_flags = anomalies[anomalies["series_type"] == "video"]
+        if not video_flags.empty:
+            st.write("Recent video anomalies:")
+            st.write(video_flags.sort_values("ds", ascending=False).head(20))
+
+    # Publish Cohorts: videos binned by publish month and by age at the end of the export
+    st.subheader("🗓️ Publish Cohorts")
+    cohorts = load_cohorts(urls["strategy"])
+    cohort_metric_column, cohort_scale_column = st.columns(2)
+    cohort_metric = cohort_metric_column.selectbox("Cohort metric:", cohorts.metrics[1:] + cohorts.metrics[:1])
+    per_video = cohort_scale_column.checkbox("Per video", value=True) and cohort_metric != "Videos"
+    plot_matrix(cohorts.matrix(cohort_metric, by="year", per_video=per_video), cohort_metric,
+        f"{cohort_metric} by Publish Year and Video Age (as of {cohorts.as_of:%b %d, %Y})", "YlOrRd")
+    plot_matrix(cohorts.calendar(cohort_metric, per_video=per_video), cohort_metric,
+        f"{cohort_metric} by Publish Month", "YlGnBu", figsize=(12, 5))
+
     # Section 2: Video Analysis with CSV Download
     st.subheader("🎥 Video Performance Insights")
     if "Video title" in data.columns:
-        selected_video = st.selectbox("Select a Video Title:", data["Video title"].unique())
+        video_index = load_video_index(urls["strategy"])
+
+        # Server-side search and pagination: only the current page of matching titles is sent to the browser
+        video_query = st.text_input("Search video titles:", key="video_query")
+        _, match_count, page_count = video_index.page(video_query, page_size=VIDEO_PAGE_SIZE)
+        video_page = 1
+        if page_count > 1:
+            video_page = st.number_input(f"Page (1-{page_count}, {match_count} matching videos):",
+                min_value=1, max_value=page_count, value=1, step=1)
+        candidates, _, _ = video_index.page(video_query, video_page, VIDEO_PAGE_SIZE)
+        if not candidates:
+            st.warning("No videos match your search.")
+
+        selected_video = st.selectbox("Select a Video Title:", candidates)
 
         if selected_video:
             selected_video = selected_video.strip()  # Ensure selected title is stripped of whitespace
-            video_data = data[data["Video title"] == selected_video]
+            video_data = video_index.rows(selected_video)
 
             if not video_data.empty:
                 st.write(f"### Total Views for **{selected_video}**: {video_data['Video views'].iloc[0]:.2f}")
@@ -271,7 +653,7 @@ with tabs[2]:
 
                 # Comparison with baselines
                 st.write(f"### Video Views Baseline: {baseline_video_views:.2f}")
-                st.write(f"### Watch Time Baseline: {baseline_watch_time:.2f} hours")
+                st.write(f"### Watch Time Baseline: {baseline_video_watch_time:.2f} hours")
                 st.write(f"### Revenue Baseline: ${baseline_video_revenue:.2f}")
 
                 # Add interactive chart for selected video
@@ -282,7 +664,7 @@ with tabs[2]:
                         video_data["Watch time (hours)"].iloc[0],
                         video_data["Video estimated revenue (USD)"].iloc[0]
                     ],
-                    "Baseline": [baseline_video_views, baseline_watch_time, baseline_video_revenue]
+                    "Baseline": [baseline_video_views, baseline_video_watch_time, baseline_video_revenue]
                 })
 
                 fig_video = px.bar(
@@ -295,13 +677,15 @@ with tabs[2]:
                 )
                 st.plotly_chart(fig_video, use_container_width=True)
 
-                # Download button for CSV
-                st.download_button(
-                    label="Download Selected Video Data as CSV",
-                    data=video_data.to_csv(index=False),
-                    file_name=f"{selected_video}_data.csv",
-                    mime="text/csv"
-                )
+                # Related videos by title similarity, limited to the current content export
+                related_videos = load_title_similarity().related(selected_video, k=5, among=video_views["Video title"])
+                if not related_videos.empty:
+                    st.write("Related videos:")
+                    st.write(related_videos)
+
+                # Download of the selected video's rows, encoded only on request
+                export_download("selected video data", lambda: frame_batches(video_data),
+                    (urls["strategy"], selected_video), f"{selected_video}_data", "selected_video")
             else:
                 st.warning("No data available for the selected video. Please try another title.")
     else:
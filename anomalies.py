@@ -0,0 +1,161 @@
+"""Online spike / drop detection for the daily channel series and, optionally, per-video series.
+
+    python anomalies.py                              # ingest any new days
+    python anomalies.py --video-daily video_daily.csv --rebuild
+
+Each series keeps a constant-size state (EWMA of log views, EW variance, days
+seen, last day ingested) in ``artifacts/anomaly_state.json``. A run only feeds
+the days after each series' last ingested day through the detector, one day at
+a time, and appends the flagged days to ``artifacts/anomalies.parquet``, which
+the dashboard reads directly. Updates are winsorised at the flag threshold, so
+a viral spike is flagged without dragging the baseline up behind it.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from datasets import DATA_DIR, read_local
+
+ANOMALY_PATH = DATA_DIR / "artifacts" / "anomalies.parquet"
+STATE_PATH = DATA_DIR / "artifacts" / "anomaly_state.json"
+ANOMALY_COLUMNS = ["series_type", "series", "metric", "ds", "value", "expected", "z", "flag"]
+ANOMALY_KEY = ["series_type", "series", "metric", "ds"]
+CHANNEL_METRICS = ["Views", "Watch time (hours)", "Estimated revenue (USD)"]
+HALFLIFE_DAYS = 14
+THRESHOLD = 3.5
+WARMUP_DAYS = 14
+MIN_STD = 0.05
+STRATEGY_DATE_FORMAT = "%m/%d/%y"
+
+
+class AnomalyDetector:
+    """EWMA / EW-variance model of log1p(value) per series, updated one observation at a time."""
+
+    def __init__(self, state=None, halflife=HALFLIFE_DAYS, threshold=THRESHOLD, warmup=WARMUP_DAYS):
+        self.state = state if state is not None else {}
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        self.threshold = threshold
+        self.warmup = warmup
+
+    def update(self, key, value):
+        """Score one observation against the series state, then fold it in; returns (expected, z, flag)."""
+        state = self.state.setdefault(key, {"mean": None, "var": 0.0, "count": 0, "last": None})
+        y = math.log1p(max(value, 0.0))
+        if state["mean"] is None:
+            state["mean"], state["count"] = y, 1
+            return value, 0.0, None
+
+        std = max(math.sqrt(state["var"]), MIN_STD)
+        residual = y - state["mean"]
+        z = residual / std
+        flag = None
+        if state["count"] >= self.warmup and abs(z) > self.threshold:
+            flag = "spike" if z > 0 else "drop"
+        expected = math.expm1(state["mean"])
+
+        # Winsorised update: an anomaly moves the baseline no more than a borderline day would
+        residual = min(max(residual, -self.threshold * std), self.threshold * std)
+        state["mean"] += self.alpha * residual
+        state["var"] = (1.0 - self.alpha) * (state["var"] + self.alpha * residual * residual)
+        state["count"] += 1
+        return expected, z, flag
+
+    def ingest(self, series_type, series, metric, daily):
+        # Feed only the days after this series' last ingested day; returns the flagged rows
+        key = f"{series_type}|{series}|{metric}"
+        last = self.state.get(key, {}).get("last")
+        if last is not None:
+            daily = daily[daily.index > pd.Timestamp(last)]
+        flags = []
+        for day, value in daily.items():
+            expected, z, flag = self.update(key, float(value))
+            if flag:
+                flags.append({"series_type": series_type, "series": series, "metric": metric, "ds": day,
+                              "value": float(value), "expected": expected, "z": z, "flag": flag})
+        if len(daily):
+            self.state[key]["last"] = daily.index[-1].isoformat()
+        return flags
+
+
+def daily_series(frame, group_column, metric, date_format=None):
+    frame = frame.assign(ds=pd.to_datetime(frame["Date"], format=date_format, errors="coerce"),
+                         y=pd.to_numeric(frame[metric], errors="coerce")).dropna(subset=["ds", "y", group_column])
+    daily = frame.groupby([group_column, "ds"], sort=True)["y"].sum()
+    for group, series in daily.groupby(level=0, sort=False):
+        yield str(group), series.droplevel(0)
+
+
+def build_series(data_dir=DATA_DIR, video_daily=None):
+    strategy = read_local("strategy", data_dir).assign(group="Channel")
+    for metric in CHANNEL_METRICS:
+        for group, series in daily_series(strategy, "group", metric, STRATEGY_DATE_FORMAT):
+            yield "channel", group, metric, series
+
+    # Per-video daily series need a daily export with Date, Video title and Views columns
+    if video_daily is not None:
+        videos = pd.read_csv(video_daily)
+        for metric in [metric for metric in CHANNEL_METRICS if metric in videos]:
+            for group, series in daily_series(videos, "Video title", metric):
+                yield "video", group, metric, series
+
+
+def _replace(path, write):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.{os.getpid()}")
+    write(partial)
+    os.replace(partial, path)
+
+
+def read_state(path=STATE_PATH):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def read_anomalies(path=ANOMALY_PATH):
+    if not Path(path).exists():
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    return pd.read_parquet(path)
+
+
+def run(data_dir=DATA_DIR, video_daily=None, state_path=STATE_PATH, anomaly_path=ANOMALY_PATH, rebuild=False):
+    state_path, anomaly_path = Path(state_path), Path(anomaly_path)
+    detector = AnomalyDetector({} if rebuild else read_state(state_path))
+    flags = []
+    for series_type, series, metric, daily in build_series(data_dir, video_daily):
+        flags.extend(detector.ingest(series_type, series, metric, daily))
+
+    new = pd.DataFrame(flags, columns=ANOMALY_COLUMNS)
+    previous = pd.DataFrame(columns=ANOMALY_COLUMNS) if rebuild else read_anomalies(anomaly_path)
+    anomalies = pd.concat([frame for frame in (previous, new) if len(frame)], ignore_index=True) \
+        if len(previous) or len(new) else new
+    anomalies = anomalies.astype({"ds": "datetime64[ns]", "value": "float64", "expected": "float64", "z": "float64"})
+    # The flags are written before the state, so a run that died in between replays its days; keep one row per day
+    anomalies = anomalies.drop_duplicates(ANOMALY_KEY, keep="last", ignore_index=True)
+    _replace(anomaly_path, lambda path: anomalies.to_parquet(path, index=False))
+    _replace(state_path, lambda path: path.write_text(json.dumps(detector.state)))
+    return new, anomalies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory holding the raw exports.")
+    parser.add_argument("--video-daily", help="Optional CSV of per-video daily rows (Date, Video title, Views).")
+    parser.add_argument("--rebuild", action="store_true", help="Drop the stored state and flags and replay history.")
+    args = parser.parse_args(argv)
+
+    new, anomalies = run(args.data_dir, args.video_daily, rebuild=args.rebuild)
+    print(f"{len(new)} new anomalies ({len(anomalies)} stored) -> {ANOMALY_PATH}")
+    if len(new):
+        print(new.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
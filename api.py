@@ -0,0 +1,266 @@
+"""Local HTTP API serving the dashboard's aggregates as JSON or Arrow, with ETags.
+
+    python api.py --port 8502
+    curl -i localhost:8502/category_summary
+    curl -i localhost:8502/top_videos?category=Wildlife&limit=5&format=arrow
+
+Endpoints: ``/category_summary``, ``/top_videos?category=&limit=``,
+``/cities?by=Views|Watch time (hours)&limit=``, ``/weekday_averages``,
+``/baselines?date=YYYY-MM-DD`` and ``/version``, plus
+``/export?search=videos|cities&q=&order_by=&format=csv|parquet|zip``, which
+streams every match of a search in chunks. Aggregates come from the
+published snapshot when there is one (see snapshots.py) and from DuckDB over
+the local exports otherwise. Each response body is built once per data version
+and cached; its ETag changes only with the data, so clients that send
+``If-None-Match`` get a ``304 Not Modified`` without any pandas work.
+"""
+import argparse
+import hashlib
+import io
+import json
+import re
+import sys
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+import pyarrow as pa
+
+import query_engine
+from baselines import BASELINE_CHOICES, BaselineEngine
+from datasets import content_version
+from exports import EXPORT_FORMATS, export
+from snapshots import SNAPSHOT_ROOT, TOP_CITIES, TOP_VIDEOS_PER_CATEGORY, Snapshot, serving_version
+
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+JSON_TYPE = "application/json"
+MAX_CACHED_RESPONSES = 1024
+_ENTITY_TAG = re.compile(r'(?:W/)?("[^"]*")')
+
+
+def local_version(sources):
+    # File sizes and modification times stand in for content hashes so the check is a few stat calls
+    stats = {name: [Path(path).stat().st_mtime_ns, Path(path).stat().st_size] for name, path in sources.items()}
+    return "local-" + content_version(json.dumps(stats, sort_keys=True).encode())
+
+
+def current_version():
+    return serving_version() or local_version(query_engine.local_sources())
+
+
+class Aggregates:
+    """The API's tables for one data version, from a snapshot when given and live DuckDB queries otherwise."""
+
+    def __init__(self, version, snapshot=None):
+        self.version = version
+        self.snapshot = snapshot
+        self.engine = None if snapshot else query_engine.QueryEngine(query_engine.local_sources())
+        daily = snapshot.frame("channel_daily") if snapshot else self.engine.query("SELECT * FROM channel_daily")
+        self.baselines = BaselineEngine(daily)
+
+    @property
+    def search_engine(self):
+        # Searches need the full tables, so a snapshot gets its own DuckDB copy on first use
+        if self.engine is None:
+            content = self.snapshot.frame("content").drop(columns=["Category", "Publish date"])
+            self.engine = query_engine.QueryEngine({"content": content, "cities": self.snapshot.frame("cities")})
+        return self.engine
+
+    def category_summary(self):
+        if self.snapshot:
+            return self.snapshot.frame("category_summary")
+        return query_engine.category_summary(self.engine)
+
+    def top_videos(self, category, limit=10):
+        if self.snapshot:
+            top = self.snapshot.frame("top_videos")
+            return top[top["Category"] == category].drop(columns="Category").head(min(limit, TOP_VIDEOS_PER_CATEGORY))
+        return query_engine.top_videos(self.engine, category, limit)
+
+    def cities(self, by="Views", limit=10):
+        if self.snapshot:
+            name = {"Views": "top_cities_views", "Watch time (hours)": "top_cities_watch_time"}.get(by)
+            if name is None:
+                raise ValueError(f"Cannot rank cities by {by!r}")
+            return self.snapshot.frame(name).head(min(limit, TOP_CITIES))
+        return query_engine.top_cities(self.engine, by, limit)
+
+    def weekday_averages(self):
+        if self.snapshot:
+            return self.snapshot.frame("weekday_averages")
+        return query_engine.weekday_averages(self.engine).reset_index()
+
+    def baseline_table(self, date=None):
+        # Every metric x baseline kind on one day (the last day of the export by default)
+        date = self.baselines.dates[-1] if date is None else pd.Timestamp(date)
+        if not self.baselines.dates[0] <= date <= self.baselines.dates[-1]:
+            raise ValueError(f"date must be between {self.baselines.dates[0].date()} and {self.baselines.dates[-1].date()}")
+        rows = [{"Metric": metric, "Baseline": kind, "Value": self.baselines.baseline(metric, kind, date)}
+                for metric in self.baselines.metrics
+                for kind in BASELINE_CHOICES.values()]
+        return pd.DataFrame(rows).assign(Date=date.date().isoformat())
+
+
+def etag_matches(if_none_match, etag):
+    # Weak comparison, as RFC 9110 requires for If-None-Match: W/ prefixes are ignored and "*" matches anything
+    if if_none_match.strip() == "*":
+        return True
+    return _ENTITY_TAG.match(etag).group(1) in _ENTITY_TAG.findall(if_none_match)
+
+
+def _limit(params):
+    limit = int(params.get("limit", 10))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return limit
+
+
+ROUTES = {
+    "/category_summary": lambda data, params: data.category_summary(),
+    "/top_videos": lambda data, params: data.top_videos(params["category"], _limit(params)),
+    "/cities": lambda data, params: data.cities(params.get("by", "Views"), _limit(params)),
+    "/weekday_averages": lambda data, params: data.weekday_averages(),
+    "/baselines": lambda data, params: data.baseline_table(params.get("date")),
+}
+# Built as soon as a data version is loaded, so the first client is served from the cache too
+PRECOMPUTED = [("/category_summary", {}), ("/cities", {}), ("/cities", {"by": "Watch time (hours)"}),
+               ("/weekday_averages", {}), ("/baselines", {})]
+
+
+def encode(frame, fmt):
+    if fmt == "arrow":
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue(), ARROW_TYPE
+    return frame.to_json(orient="records", date_format="iso").encode(), JSON_TYPE
+
+
+class ResponseCache:
+    """Encoded bodies and ETags per (path, params, format), dropped wholesale when the data version changes."""
+
+    def __init__(self, version_source=current_version):
+        self._version_source = version_source
+        self._lock = threading.Lock()
+        self._data = None
+        self._responses = {}
+
+    def data(self):
+        version = self._version_source()
+        with self._lock:
+            if self._data is None or self._data.version != version:
+                snapshot = Snapshot(SNAPSHOT_ROOT / version) if version == serving_version() else None
+                self._data = Aggregates(version, snapshot)
+                self._responses = {}
+            return self._data
+
+    def get(self, path, params, fmt):
+        data = self.data()
+        key = (path, tuple(sorted(params.items())), fmt)
+        response = self._responses.get(key)
+        if response is None:
+            body, content_type = encode(ROUTES[path](data, params), fmt)
+            etag = f'"{data.version}-{hashlib.sha256(body).hexdigest()[:16]}"'
+            response = (body, content_type, etag)
+            with self._lock:
+                if data is self._data:
+                    if len(self._responses) >= MAX_CACHED_RESPONSES:
+                        self._responses.clear()
+                    self._responses[key] = response
+        return response
+
+    def warm(self):
+        for path, params in PRECOMPUTED:
+            self.get(path, params, "json")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    cache = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        if url.path == "/export":
+            return self._export(params)
+        fmt = params.pop("format", "arrow" if ARROW_TYPE in self.headers.get("Accept", "") else "json")
+        if url.path == "/version":
+            return self._send(HTTPStatus.OK, json.dumps({"version": self.cache.data().version}).encode(), JSON_TYPE)
+        if url.path not in ROUTES or fmt not in ("json", "arrow"):
+            return self._error(HTTPStatus.NOT_FOUND, f"Unknown endpoint or format: {url.path} ({fmt})")
+        try:
+            body, content_type, etag = self.cache.get(url.path, params, fmt)
+        except KeyError as error:
+            return self._error(HTTPStatus.BAD_REQUEST, f"Missing parameter {error}")
+        except ValueError as error:
+            return self._error(HTTPStatus.BAD_REQUEST, str(error))
+
+        if etag_matches(self.headers.get("If-None-Match", ""), etag):
+            return self._send(HTTPStatus.NOT_MODIFIED, b"", content_type, etag)
+        self._send(HTTPStatus.OK, body, content_type, etag)
+
+    def _export(self, params):
+        # Bulk exports are streamed batch by batch with chunked encoding and never cached
+        fmt = params.get("format", "csv")
+        try:
+            kind = params["search"]
+            if kind not in query_engine.SEARCHES or fmt not in EXPORT_FORMATS:
+                raise ValueError(f"Unknown search or format: {kind} ({fmt})")
+            sql = query_engine.search_sql(kind, params.get("order_by"), params.get("descending", "1") != "0")
+            batches = self.cache.data().search_engine.batches(sql, [params.get("q", "")])
+        except KeyError as error:
+            return self._error(HTTPStatus.BAD_REQUEST, f"Missing parameter {error}")
+        except ValueError as error:
+            return self._error(HTTPStatus.BAD_REQUEST, str(error))
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", EXPORT_FORMATS[fmt]["mime"])
+        self.send_header("Content-Disposition", f'attachment; filename="{kind}{EXPORT_FORMATS[fmt]["suffix"]}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in export(batches, fmt, kind):
+            if chunk:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({"error": message}).encode(), JSON_TYPE)
+
+    def _send(self, status, body, content_type, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=8502, help="Port to listen on.")
+    args = parser.parse_args(argv)
+
+    Handler.cache = ResponseCache()
+    Handler.cache.warm()
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Serving data version {Handler.cache.data().version} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+BASELINE_METRICS = ["Views", "Watch time (hours)", "Estimated revenue (USD)"]
+TRAILING_WINDOWS = (7, 28, 90)
+WEEKDAY_WEEKS = 4
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+BASELINE_CHOICES = {
+    "Selected range average": "all",
+    "Trailing 7 days": "7d",
+    "Trailing 28 days": "28d",
+    "Trailing 90 days": "90d",
+    f"Same weekday (last {WEEKDAY_WEEKS} weeks)": "weekday",
+}
+
+
+def _prefix(values):
+    # Leading zero row so prefix[stop] - prefix[start] is the sum over [start, stop)
+    return np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+
+
+def _weekly_prefix(values):
+    # Same as _prefix but strided by 7 days: row i accumulates i, i-7, i-14, ...
+    n, m = values.shape
+    padded = np.zeros((-(-n // 7) * 7, m))
+    padded[:n] = values
+    strided = np.cumsum(padded.reshape(-1, 7, m), axis=0).reshape(-1, m)[:n]
+    return strided
+
+
+def _trailing(prefix, window):
+    stop = np.arange(1, len(prefix))
+    start = np.maximum(stop - window, 0)
+    return prefix[stop] - prefix[start]
+
+
+def _trailing_weekly(prefix, weeks):
+    out = prefix.copy()
+    lag = 7 * weeks
+    out[lag:] -= prefix[:-lag]
+    return out
+
+
+class BaselineEngine:
+    """Trailing and same-weekday baselines for the daily channel series, built from prefix sums."""
+
+    def __init__(self, data, metrics=BASELINE_METRICS, windows=TRAILING_WINDOWS, weekday_weeks=WEEKDAY_WEEKS):
+        daily = data.dropna(subset=["Date"]).groupby("Date")[metrics].sum(min_count=1)
+        calendar = pd.date_range(daily.index.min(), daily.index.max(), freq="D")
+        daily = daily.reindex(calendar)
+
+        self.metrics = list(metrics)
+        self.dates = calendar
+        values = daily.to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        values = np.where(valid, values, 0.0)
+
+        # Missing days are skipped rather than counted as zero
+        self._sums = _prefix(values)
+        self._counts = _prefix(valid.astype(float))
+        self._weekly_sums = _weekly_prefix(values)
+        self._weekly_counts = _weekly_prefix(valid.astype(float))
+
+        columns = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for window in windows:
+                means = _trailing(self._sums, window) / _trailing(self._counts, window)
+                for j, metric in enumerate(self.metrics):
+                    columns[(metric, f"{window}d")] = means[:, j]
+            means = (_trailing_weekly(self._weekly_sums, weekday_weeks)
+                     / _trailing_weekly(self._weekly_counts, weekday_weeks))
+            for j, metric in enumerate(self.metrics):
+                columns[(metric, "weekday")] = means[:, j]
+        self.table = pd.DataFrame(columns, index=calendar)
+
+    def _position(self, date):
+        date = pd.Timestamp(date).normalize()
+        return int(min(max((date - self.dates[0]).days, 0), len(self.dates) - 1))
+
+    def _bounds(self, start=None, end=None):
+        start = 0 if start is None else self._position(start)
+        stop = len(self.dates) if end is None else self._position(end) + 1
+        return start, max(stop, start)
+
+    def baseline(self, metric, kind, date=None):
+        if kind == "all":
+            return self.range_mean(metric, end=date)
+        position = len(self.dates) - 1 if date is None else self._position(date)
+        return self.table[(metric, kind)].iat[position]
+
+    def range_mean(self, metric, start=None, end=None):
+        j = self.metrics.index(metric)
+        start, stop = self._bounds(start, end)
+        count = self._counts[stop, j] - self._counts[start, j]
+        return (self._sums[stop, j] - self._sums[start, j]) / count if count else np.nan
+
+    def weekday_means(self, start=None, end=None):
+        # Weekday averages over any date range from the 7-day strided prefix sums: O(7) per query
+        start, stop = self._bounds(start, end)
+        rows = {}
+        for position in range(stop - 7, stop):
+            if position < start:
+                continue
+            before = position - 7 * (-(-(position - start + 1) // 7))
+            sums = self._weekly_sums[position] - (self._weekly_sums[before] if before >= 0 else 0.0)
+            counts = self._weekly_counts[position] - (self._weekly_counts[before] if before >= 0 else 0.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rows[self.dates[position].day_name()] = sums / counts
+        return pd.DataFrame.from_dict(rows, orient="index", columns=self.metrics).reindex(WEEKDAYS)
+
+    def weekday_baselines(self, metric, date=None):
+        # Same-weekday baseline for each of the seven days ending on `date`
+        stop = len(self.dates) if date is None else self._position(date) + 1
+        recent = self.table[(metric, "weekday")].iloc[max(stop - 7, 0):stop]
+        return pd.Series(recent.to_numpy(), index=recent.index.day_name()).reindex(WEEKDAYS)
@@ -0,0 +1,163 @@
+"""Fit one forecast per category, top video and the channel total in a process pool.
+
+    python batch_forecast.py --periods 90 --workers 4 --timeout 30
+
+All forecasts land in a single Parquet file (``artifacts/forecasts.parquet`` by
+default) with one row per group and date, which the dashboard reads directly.
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from categories import assign_category
+from datasets import DATA_DIR, read_local
+from forecasting import SeasonalForecaster
+
+FORECAST_PATH = DATA_DIR / "artifacts" / "forecasts.parquet"
+FORECAST_COLUMNS = ["group_type", "group", "ds", "yhat", "yhat_lower", "yhat_upper"]
+MIN_POINTS = 10
+# Fourier orders shrink until every seasonal coefficient has this many points behind it
+POINTS_PER_TERM = 10
+MAX_WEEKLY_ORDER, MAX_YEARLY_ORDER = 3, 10
+# Guard, not a fix: a fit that still runs past this multiple of the series' largest value is discarded
+MAX_FORECAST_RATIO = 10.0
+WORKER_CRASHED = "error: worker crashed"
+
+
+class GroupTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise GroupTimeout()
+
+
+def partition_series(frame, group_type, group_column, date_column, value_column):
+    # One (ds, y) series per group, summing rows that share a date
+    frame = frame.assign(ds=pd.to_datetime(frame[date_column], errors="coerce"),
+                         y=pd.to_numeric(frame[value_column], errors="coerce"))
+    frame = frame.dropna(subset=["ds", "y", group_column])
+    daily = frame.groupby([group_column, "ds"], sort=True)["y"].sum().reset_index()
+    for group, series in daily.groupby(group_column, sort=False):
+        yield group_type, str(group), series[["ds", "y"]].reset_index(drop=True)
+
+
+def build_groups(data_dir=DATA_DIR, video_daily=None, top_videos=50):
+    content = read_local("content", data_dir)
+    content["Category"] = content["Video title"].apply(assign_category)
+    yield from partition_series(content, "category", "Category", "Video publish time", "Views")
+
+    strategy = read_local("strategy", data_dir).assign(group="Channel")
+    yield from partition_series(strategy, "channel", "group", "Date", "Views")
+
+    # The checked-in exports only carry per-video totals; per-video series need a daily export
+    if video_daily is not None:
+        videos = pd.read_csv(video_daily)
+        top = videos.groupby("Video title")["Views"].sum().nlargest(top_videos).index
+        yield from partition_series(videos[videos["Video title"].isin(top)], "video", "Video title", "Date", "Views")
+
+
+def seasonal_orders(points):
+    # Two coefficients per order; weekly terms take their share of the points before yearly ones
+    weekly = int(np.clip(points // (2 * POINTS_PER_TERM), 1, MAX_WEEKLY_ORDER))
+    yearly = int(np.clip((points - 2 * POINTS_PER_TERM * weekly) // (2 * POINTS_PER_TERM), 1, MAX_YEARLY_ORDER))
+    return weekly, yearly
+
+
+def fit_group(group_type, group, series, periods, engine, timeout):
+    started = time.perf_counter()
+    use_alarm = timeout and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if len(series) < MIN_POINTS:
+            return group_type, group, "skipped", None, time.perf_counter() - started
+        weekly_order, yearly_order = seasonal_orders(len(series))
+        if engine == "prophet":
+            from prophet import Prophet
+            # Integer seasonalities are Fourier orders in Prophet
+            model = Prophet(yearly_seasonality=yearly_order, weekly_seasonality=weekly_order, daily_seasonality=False)
+        else:
+            model = SeasonalForecaster(yearly_order=yearly_order, weekly_order=weekly_order)
+        model.fit(series)
+        forecast = model.predict(model.make_future_dataframe(periods=periods, include_history=False))
+        forecast = forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]]
+        bound = MAX_FORECAST_RATIO * series["y"].abs().max()
+        values = forecast[["yhat", "yhat_lower", "yhat_upper"]].to_numpy()
+        if not np.isfinite(values).all() or (np.abs(forecast["yhat"]) > bound).any():
+            return group_type, group, "rejected", None, time.perf_counter() - started
+        forecast.insert(0, "group", group)
+        forecast.insert(0, "group_type", group_type)
+        return group_type, group, "ok", forecast, time.perf_counter() - started
+    except GroupTimeout:
+        return group_type, group, "timeout", None, time.perf_counter() - started
+    except Exception as e:
+        return group_type, group, f"error: {e}", None, time.perf_counter() - started
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def run_batch(groups, periods=90, engine="fast", workers=None, timeout=30.0, output=FORECAST_PATH):
+    forecasts, statuses = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for group_type, group, series in groups:
+            try:
+                futures[pool.submit(fit_group, group_type, group, series, periods, engine, timeout)] = (group_type, group)
+            except BrokenProcessPool:
+                statuses.append({"group_type": group_type, "group": group, "status": WORKER_CRASHED, "seconds": None})
+        for future in as_completed(futures):
+            try:
+                group_type, group, status, forecast, seconds = future.result()
+            except BrokenProcessPool:
+                # A dead worker (OOM kill, native crash) fails its group and every unfinished one, not the run
+                (group_type, group), status, forecast, seconds = futures[future], WORKER_CRASHED, None, None
+            statuses.append({"group_type": group_type, "group": group, "status": status, "seconds": seconds})
+            if forecast is not None:
+                forecasts.append(forecast)
+
+    result = pd.concat(forecasts, ignore_index=True) if forecasts else pd.DataFrame(columns=FORECAST_COLUMNS)
+    result = result.astype({"group_type": "category", "group": "category"})
+    result = result.sort_values(["group_type", "group", "ds"]).reset_index(drop=True)
+
+    # Write beside the target and rename so readers never see a partial file
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    partial = output.with_name(f".{output.name}.{os.getpid()}")
+    result.to_parquet(partial, index=False)
+    os.replace(partial, output)
+    return result, pd.DataFrame(statuses, columns=["group_type", "group", "status", "seconds"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--periods", type=int, default=90, help="Days to forecast past the end of each series.")
+    parser.add_argument("--engine", choices=["fast", "prophet"], default="fast")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count).")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds allowed per group fit.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--video-daily", default=None, help="Optional CSV with Date, Video title and Views per day.")
+    parser.add_argument("--top-videos", type=int, default=50)
+    parser.add_argument("--output", default=FORECAST_PATH)
+    args = parser.parse_args(argv)
+
+    groups = build_groups(args.data_dir, args.video_daily, args.top_videos)
+    result, statuses = run_batch(groups, args.periods, args.engine, args.workers, args.timeout, args.output)
+    print(statuses.groupby("status").size().to_string())
+    print(f"Wrote {len(result)} forecast rows for {result['group'].nunique()} groups to {args.output}")
+    failed = statuses["status"].eq("timeout") | statuses["status"].str.startswith("error")
+    return 1 if failed.any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
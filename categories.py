@@ -0,0 +1,32 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = {
+    "Border Security": ["border", "customs", "security"],
+    "Wildlife": ["wildlife", "animal", "nature", "wild", "hunting", "bear"],
+    "Adventure": ["adventure", "journey", "explore", "trap", "wilderness", "weather", "severe", "survive", "climbing", "storm", "coast guard"],
+    "Crime": ["crime", "criminal", "police", "investigation", "drug", "jail", "sin"],
+    "Human Stories & Disaster": ["life", "story", "family", "personal", "survive", "tsunami", "earthquake", "tornado", "dead", "risk", "tribe"],
+    "Vehicles": ["car", "truck", "vehicle", "auto", "transport"],
+    "Maritime": ["ship", "boat", "ocean", "sea", "fish", "fishing", "sail", "sailor"],
+    "Bull Fight": ["bulls", "matadors"],
+    "Battle & Special Forces": ["battle", "war", "afghanistan", "training", "special forces", "rescue", "fight", "swat", "k-9"]
+}
+
+
+def assign_category(title):
+    for category, keywords in CATEGORIES.items():
+        if any(keyword.lower() in str(title).lower() for keyword in keywords):
+            return category
+    return "Other"
+
+
+def keyword_labels(titles):
+    # Vectorised assign_category matching whole words only, so "sin" no longer hits "business"
+    titles = titles.astype("string").fillna("")
+    hits = [titles.str.contains(r"\b(?:" + "|".join(re.escape(keyword) for keyword in keywords) + r")\b",
+                                case=False, regex=True).to_numpy(dtype=bool)
+            for keywords in CATEGORIES.values()]
+    return pd.Series(np.select(hits, list(CATEGORIES), "Other"), index=titles.index)
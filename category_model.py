@@ -0,0 +1,112 @@
+"""Learned alternative to the keyword category rules, seeded from the rules themselves.
+
+    python category_model.py
+
+Titles are hashed into word unigram and bigram features (no vocabulary to fit
+or store) and a linear model is trained on the titles whose keywords match
+whole words. It then labels every title, including those no keyword catches,
+in large sparse batches; predictions below ``MIN_CONFIDENCE`` stay "Other".
+The fitted model is saved under ``artifacts/models/`` keyed on the training
+titles, the category rules and the library version, so later runs load it
+instead of retraining.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from categories import CATEGORIES, assign_category, keyword_labels
+from datasets import DATA_DIR, content_version, read_local
+
+MODEL_DIR = DATA_DIR / "artifacts" / "models"
+N_FEATURES = 2**16
+MIN_CONFIDENCE = 0.5
+BATCH_SIZE = 50_000
+SETTINGS = {"n_features": N_FEATURES, "ngram_range": (1, 2), "alpha": 1e-4, "max_iter": 50}
+
+
+def _vectorizer():
+    return HashingVectorizer(n_features=N_FEATURES, ngram_range=SETTINGS["ngram_range"], alternate_sign=False)
+
+
+def model_version(titles):
+    titles = sorted(set(titles.dropna().astype(str)))
+    return content_version(json.dumps({
+        "titles": content_version("\n".join(titles).encode()),
+        "categories": CATEGORIES,
+        "settings": SETTINGS,
+        "sklearn": sklearn.__version__,
+    }, sort_keys=True).encode())
+
+
+class CategoryModel:
+    def __init__(self, classifier):
+        self.classifier = classifier
+        self._vectorizer = _vectorizer()
+
+    @classmethod
+    def train(cls, titles):
+        titles = titles.dropna().astype(str)
+        labels = keyword_labels(titles)
+        seeded = (labels != "Other").to_numpy()
+        classifier = SGDClassifier(loss="log_loss", alpha=SETTINGS["alpha"], max_iter=SETTINGS["max_iter"],
+                                   tol=None, class_weight="balanced", random_state=0)
+        classifier.fit(_vectorizer().transform(titles[seeded]), labels[seeded])
+        return cls(classifier)
+
+    def predict(self, titles, batch_size=BATCH_SIZE):
+        titles = pd.Series(titles)
+        present = titles.notna().to_numpy()
+        texts = titles[present].astype(str).tolist()
+        labels = np.full(len(texts), "Other", dtype=object)
+        for start in range(0, len(texts), batch_size):
+            probabilities = self.classifier.predict_proba(self._vectorizer.transform(texts[start:start + batch_size]))
+            best = probabilities.argmax(axis=1)
+            confident = probabilities[np.arange(len(best)), best] >= MIN_CONFIDENCE
+            labels[start:start + batch_size] = np.where(confident, self.classifier.classes_[best], "Other")
+        result = pd.Series("Other", index=titles.index, dtype=object)
+        result[present] = labels
+        return result
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f".{path.name}.{os.getpid()}")
+        joblib.dump(self.classifier, partial)
+        os.replace(partial, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(joblib.load(path))
+
+
+def load_or_train(titles, root=MODEL_DIR):
+    path = Path(root) / f"category-{model_version(titles)}.joblib"
+    if path.exists():
+        return CategoryModel.load(path)
+    model = CategoryModel.train(titles)
+    model.save(path)
+    return model
+
+
+def main(argv=None):
+    titles = read_local("content")["Video title"]
+    model = load_or_train(titles)
+    comparison = pd.DataFrame({
+        "keyword rules": titles.map(assign_category).value_counts(),
+        "whole-word seeds": keyword_labels(titles).value_counts(),
+        "model": model.predict(titles).value_counts(),
+    }).fillna(0).astype(int)
+    print(comparison.to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
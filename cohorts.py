@@ -0,0 +1,75 @@
+import calendar
+
+import numpy as np
+import pandas as pd
+
+AGE_EDGES = [0, 8, 31, 91, 181, 366, 731]
+AGE_LABELS = ["0-7d", "8-30d", "31-90d", "91-180d", "181-365d", "1-2y", "2y+"]
+COHORT_METRICS = {"Views": "Video views", "Revenue (USD)": "Video estimated revenue (USD)",
+                  "Watch time (hours)": "Watch time (hours).1"}
+PUBLISH_FORMAT = "%d-%b-%y"
+
+
+class PublishCohorts:
+    """Videos binned by publish month and by age in days, summed into cohort x age matrices.
+
+    Every video falls into one publish-month row and one age-bucket column
+    (its age on ``as_of``, by default the last day of the export), so each
+    metric matrix is a single weighted ``np.bincount`` over the flattened
+    cell codes. Yearly cohorts and the publish calendar are sums of the monthly
+    rows.
+    """
+
+    def __init__(self, videos, as_of=None, publish_column="Video publish time", date_format=PUBLISH_FORMAT):
+        published = pd.to_datetime(videos[publish_column], format=date_format, errors="coerce")
+        if as_of is None:
+            as_of = videos["Date"].max() if "Date" in videos else published.max()
+        self.as_of = pd.Timestamp(as_of)
+        keep = (videos["Video title"].notna() & published.notna() & (published <= self.as_of)).to_numpy()
+        videos, published = videos[keep], published[keep]
+
+        month_number = (published.dt.year * 12 + published.dt.month - 1).to_numpy()
+        first = month_number.min() if len(month_number) else 0
+        month_codes = month_number - first
+        self.months = pd.period_range(pd.Period(year=first // 12, month=first % 12 + 1, freq="M"),
+                                      periods=int(month_codes.max()) + 1 if len(month_codes) else 0, freq="M")
+
+        ages = (self.as_of - published).dt.days.to_numpy()
+        age_codes = np.searchsorted(AGE_EDGES, ages, side="right") - 1
+        cells = month_codes * len(AGE_LABELS) + age_codes
+        shape = (len(self.months), len(AGE_LABELS))
+
+        self._matrices = {"Videos": np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape)}
+        for metric, column in COHORT_METRICS.items():
+            weights = videos[column].astype("float64").fillna(0.0).to_numpy()
+            self._matrices[metric] = np.bincount(cells, weights=weights, minlength=shape[0] * shape[1]).reshape(shape)
+
+    @property
+    def metrics(self):
+        return list(self._matrices)
+
+    def matrix(self, metric="Views", by="month", per_video=False):
+        """Cohort x age-bucket table of ``metric``; ``by="year"`` folds the monthly cohorts into years."""
+        values = self._matrices[metric].astype("float64")
+        counts = self._matrices["Videos"].astype("float64")
+        index = self.months.astype(str)
+        if by == "year":
+            years = self.months.year.to_numpy()
+            starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+            values, counts = np.add.reduceat(values, starts), np.add.reduceat(counts, starts)
+            index = years[starts].astype(str)
+        if per_video:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = values / counts
+        return pd.DataFrame(values, index=pd.Index(index, name="Cohort"),
+                            columns=pd.CategoricalIndex(AGE_LABELS, categories=AGE_LABELS, ordered=True, name="Age"))
+
+    def calendar(self, metric="Views", per_video=False):
+        # Publish year x calendar month, over all ages
+        values = self._matrices[metric].sum(axis=1).astype("float64")
+        if per_video:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = values / self._matrices["Videos"].sum(axis=1)
+        table = pd.DataFrame({"Year": self.months.year, "Month": self.months.strftime("%b"), metric: values})
+        table = table[self._matrices["Videos"].sum(axis=1) > 0]
+        return table.pivot(index="Year", columns="Month", values=metric).reindex(columns=list(calendar.month_abbr)[1:])
@@ -0,0 +1,102 @@
+"""Shrink the content and city tables in memory and report the savings.
+
+    python compaction.py
+
+Repeated strings become categoricals, other strings move to Arrow string
+storage, ``H:MM:SS`` durations become int32 seconds (``<column> (s)``), whole
+number metrics get the smallest signed integer type that holds them and
+fractional metrics drop to float32 when that does not change any value at the
+exports' four-decimal precision.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from datasets import read_local
+
+DURATION_PATTERN = r"\d+:\d{2}:\d{2}"
+CATEGORY_MAX_RATIO = 0.5
+FLOAT32_TOLERANCE = 5e-5
+INTEGER_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+def is_duration(values):
+    if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+        return False
+    present = values.dropna().astype(str)
+    return bool(len(present)) and present.str.fullmatch(DURATION_PATTERN).all()
+
+
+def duration_seconds(values):
+    parts = values.astype("string[pyarrow]").str.split(":", expand=True).astype("float64")
+    seconds = parts[0] * 3600 + parts[1] * 60 + parts[2]
+    return seconds.astype("Int32" if seconds.isna().any() else "int32")
+
+
+def smallest_integer(values):
+    low, high = values.min(), values.max()
+    for candidate in INTEGER_TYPES:
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max:
+            break
+    if values.isna().any():
+        return values.astype(pd.api.types.pandas_dtype(candidate.__name__.capitalize()))
+    return values.astype(candidate)
+
+
+def compact_column(values):
+    if pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+        if values.nunique() <= CATEGORY_MAX_RATIO * len(values):
+            return values.astype("category")
+        return values.astype("string[pyarrow]")
+
+    if pd.api.types.is_integer_dtype(values):
+        return smallest_integer(values)
+
+    if pd.api.types.is_float_dtype(values):
+        finite = values.dropna().to_numpy()
+        if np.array_equal(finite, np.round(finite)):
+            return smallest_integer(values)
+        narrowed = values.astype(np.float32)
+        if np.nanmax(np.abs(narrowed.to_numpy(np.float64) - values.to_numpy()), initial=0.0) < FLOAT32_TOLERANCE:
+            return narrowed
+    return values
+
+
+def compact(frame):
+    columns = {}
+    for column in frame.columns:
+        if is_duration(frame[column]):
+            columns[f"{column} (s)"] = duration_seconds(frame[column])
+        else:
+            columns[column] = compact_column(frame[column])
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def memory_mb(frame):
+    return frame.memory_usage(deep=True).sum() / 2**20
+
+
+def memory_report(pairs):
+    rows = []
+    for name, (before, after) in pairs.items():
+        rows.append({"dataset": name, "before (MB)": memory_mb(before), "after (MB)": memory_mb(after)})
+    report = pd.DataFrame(rows)
+    report["saved (%)"] = 100.0 * (1.0 - report["after (MB)"] / report["before (MB)"])
+    return report
+
+
+def main(argv=None):
+    pairs = {}
+    for name in ("content", "cities"):
+        before = read_local(name)
+        pairs[name] = (before, compact(before))
+    print(memory_report(pairs).to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    for name, (_, after) in pairs.items():
+        print(f"\n{name}:\n{after.dtypes.to_string()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
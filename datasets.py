@@ -0,0 +1,74 @@
+import hashlib
+import os
+import urllib.request
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent
+
+# Local copies of the exports the dashboard downloads, keyed like FINAL.py's `urls`
+FILES = {
+    "age": "viewer_age.csv",
+    "gender": "Viewer_gender.csv",
+    "cities": "Viewer_Cities.csv",
+    "subscriptions": "Subscription_status.csv",
+    "content": "DangerTV_Content.csv",
+    "strategy": "dates data.csv",
+    "subscription_daily": "Subscription status_Chart data.csv",
+}
+
+
+# Where the dashboard downloads each export from
+URLS = {
+    "age": "https://raw.githubusercontent.com/violetzq/MYCOMM599/028782a8bd347b54aa1c748cd8c985e8b1d39645/viewer_age.csv",
+    "gender": "https://raw.githubusercontent.com/violetzq/MYCOMM599/main/Viewer_gender.csv",
+    "cities": "https://raw.githubusercontent.com/violetzq/MYCOMM599/main/Viewer_Cities.csv",
+    "subscriptions": "https://raw.githubusercontent.com/violetzq/MYCOMM599/main/Subscription_status.csv",
+    "subscription_daily": "https://raw.githubusercontent.com/violetzq/MYCOMM599/main/Subscription%20status_Chart%20data.csv",
+    "content": "https://raw.githubusercontent.com/violetzq/MYCOMM599/main/DangerTV_Content.csv",
+    "strategy": "https://raw.githubusercontent.com/violetzq/MYCOMM599/919d85a4502a9906dafce8935dc413e86f8690c3/dates%20data.csv",
+}
+
+
+def dataset_urls():
+    # DANGERTV_LOCAL_DATA points the dashboard at the checked-in CSVs (offline runs, load_test.py)
+    if os.environ.get("DANGERTV_LOCAL_DATA"):
+        return {name: str(local_path(name)) for name in URLS}
+    return dict(URLS)
+
+
+class DataSource(NamedTuple):
+    """An export's URL plus the content hash it was read at, so caches keyed on it follow the data."""
+    url: str
+    version: str
+
+
+def fetch(url):
+    # Raw bytes of an export from its URL or local path
+    if str(url).startswith(("http://", "https://")):
+        with urllib.request.urlopen(url, timeout=60) as response:
+            return response.read()
+    return Path(url).read_bytes()
+
+
+def local_path(name, data_dir=DATA_DIR):
+    return Path(data_dir) / FILES[name]
+
+
+def read_local(name, data_dir=DATA_DIR):
+    return pd.read_csv(local_path(name, data_dir))
+
+
+def content_version(content):
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def code_version(root=DATA_DIR, salt=""):
+    # Hash of every top-level module, so derived artifacts are rebuilt whenever the code changes
+    digest = hashlib.sha256(salt.encode())
+    for path in sorted(Path(root).glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ["Age", "Gender", "Subscription"]
+METRICS = ["Views", "Watch time (hours)"]
+
+
+def _shares(frame, label_column, percent_columns):
+    shares = frame[percent_columns].to_numpy(dtype=float)
+    return frame[label_column].astype(str).tolist(), shares / shares.sum(axis=0)
+
+
+class DemographicCube:
+    """Absolute Views and Watch time estimates per age x gender x subscription cell.
+
+    The exports only give each dimension's percentage split, so cells assume the
+    three splits are independent: channel total x age share x gender share x
+    subscription share, per metric. The result is a small dense array of shape
+    (ages, genders, subscription statuses, metrics) whose marginals reproduce the
+    exported splits exactly.
+    """
+
+    def __init__(self, age, gender, subscriptions):
+        ages, age_shares = _shares(age, "Viewer age", ["Views (%)", "Watch time (hours) (%)"])
+        genders, gender_shares = _shares(gender, "Viewer gender", ["Views (%)", "Watch time (hours) (%)"])
+
+        is_total = subscriptions["Subscription status"] == "Total"
+        statuses, subscription_shares = _shares(subscriptions[~is_total], "Subscription status", METRICS)
+        if is_total.any():
+            totals = subscriptions.loc[is_total, METRICS].to_numpy(dtype=float)[0]
+        else:
+            totals = subscriptions[METRICS].to_numpy(dtype=float).sum(axis=0)
+
+        self.labels = {"Age": ages, "Gender": genders, "Subscription": statuses}
+        self._positions = {dimension: {label: i for i, label in enumerate(labels)}
+                           for dimension, labels in self.labels.items()}
+        self.cells = np.einsum("am,gm,sm,m->agsm", age_shares, gender_shares, subscription_shares, totals)
+
+    def breakdown(self, metric="Views", by=("Age",), **filters):
+        """Sum ``metric`` over every dimension not in ``by``, optionally fixing some to one label.
+
+        ``breakdown("Views", by=("Age", "Gender"), Subscription="Subscribed")``
+        returns an age x gender table of views from subscribers.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        if len(by) > 2:
+            raise ValueError("Break down by at most two dimensions; slice self.cells for more")
+        index = [slice(None)] * len(DIMENSIONS) + [METRICS.index(metric)]
+        for dimension, label in filters.items():
+            index[DIMENSIONS.index(dimension)] = self._positions[dimension][label]
+        values = self.cells[tuple(index)]
+
+        # Integer filters drop their axis, so only the unfixed dimensions remain, in order
+        remaining = [dimension for dimension in DIMENSIONS if dimension not in filters]
+        summed = tuple(axis for axis, dimension in enumerate(remaining) if dimension not in by)
+        values = values.sum(axis=summed) if summed else values
+        kept = [dimension for dimension in remaining if dimension in by]
+
+        if len(kept) == 0:
+            return float(values)
+        if len(kept) == 1:
+            return pd.Series(values, index=pd.Index(self.labels[kept[0]], name=kept[0]), name=metric)
+        if kept != by:
+            values = values.T
+        return pd.DataFrame(values, index=pd.Index(self.labels[by[0]], name=by[0]),
+                            columns=pd.Index(self.labels[by[1]], name=by[1]))
@@ -0,0 +1,81 @@
+"""Derived content metrics declared once and evaluated for every video in one pass.
+
+A metric is either a *component*, an additive per-video quantity written as an
+expression over the export's columns (backtick-quoted, as in ``DataFrame.eval``),
+or a *ratio* of two additive quantities times a scale. Ratios are what make
+group summaries correct: a category's CTR is its total clicks over its total
+impressions, not the mean of its videos' CTRs. The same declarations compile to
+one ``DataFrame.eval`` program (numexpr when it is installed) for per-video
+values and to one DuckDB ``GROUP BY`` for summaries.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+CTR = "Impressions click-through rate (%)"
+COMPONENTS = {
+    "Clicks": f"`Impressions` * `{CTR}` / 100",
+    "CTR-weighted views": f"`Views` * `{CTR}` / 100",
+}
+# name -> (numerator, denominator, scale)
+RATIOS = {
+    CTR: ("Clicks", "Impressions", 100),
+    "RPM (USD)": ("Estimated revenue (USD)", "Views", 1000),
+    "Watch time per impression (minutes)": ("Watch time (hours)", "Impressions", 60),
+    "Subscribers per 1k views": ("Subscribers", "Views", 1000),
+}
+SUMMED = ["Views", "Watch time (hours)", "CTR-weighted views"]
+
+_COLUMN = re.compile(r"`([^`]+)`")
+
+
+def _inputs(expression):
+    return set(_COLUMN.findall(expression))
+
+
+def available(columns):
+    """Components and ratios whose inputs are all present in ``columns``."""
+    columns = set(columns)
+    components = {name: expression for name, expression in COMPONENTS.items() if _inputs(expression) <= columns}
+    known = columns | set(components)
+    ratios = {name: ratio for name, ratio in RATIOS.items() if {ratio[0], ratio[1]} <= known}
+    return components, ratios
+
+
+def evaluate(frame):
+    """``frame`` with every available component and ratio added as a column."""
+    components, ratios = available(frame.columns)
+    # A ratio named after a source column (CTR) already holds its per-video value
+    ratios = {name: ratio for name, ratio in ratios.items() if name not in frame}
+    if not components and not ratios:
+        return frame.copy()
+
+    # eval mangles quoted assignment targets, so results go to plain aliases that later lines can reference
+    derived = list(components) + list(ratios)
+    aliases = {name: f"derived_{position}" for position, name in enumerate(derived)}
+    operand = lambda column: aliases.get(column, f"`{column}`")
+    program = [f"{aliases[name]} = {expression}" for name, expression in components.items()]
+    program += [f"{aliases[name]} = {scale} * {operand(numerator)} / {operand(denominator)}"
+                for name, (numerator, denominator, scale) in ratios.items()]
+    inputs = set().union(*map(_inputs, components.values()), *(ratio[:2] for ratio in ratios.values()))
+    numeric = frame[[column for column in frame if column in inputs]].apply(pd.to_numeric, errors="coerce")
+    numeric = numeric.astype("float64")
+    evaluated = numeric.eval("\n".join(program))[list(aliases.values())].replace([np.inf, -np.inf], np.nan)
+    return frame.assign(**{name: evaluated[alias] for name, alias in aliases.items()})
+
+
+def _sql(expression):
+    return _COLUMN.sub(lambda match: '"' + match.group(1).replace('"', '""') + '"', expression)
+
+
+def summary_sql(table, by, columns):
+    """Summed totals and ratio-of-sums metrics per ``by`` group of ``table``, given the table's column names."""
+    components, ratios = available(columns)
+    additive = {column: _sql(components[column]) if column in components else _sql(f"`{column}`")
+                for column in SUMMED + [column for ratio in ratios.values() for column in ratio[:2]]
+                if column in components or column in columns}
+    selects = [f'sum({additive[column]}) AS "{column}"' for column in SUMMED if column in additive]
+    selects += [f'{scale} * sum({additive[numerator]}) / nullif(sum({additive[denominator]}), 0) AS "{name}"'
+                for name, (numerator, denominator, scale) in ratios.items()]
+    return f'SELECT "{by}", {", ".join(selects)} FROM {table} GROUP BY "{by}" ORDER BY "{by}"'
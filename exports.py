@@ -0,0 +1,87 @@
+"""Chunked CSV / Parquet / zip encoders over Arrow record batches.
+
+Every encoder is a generator: it takes a ``pyarrow.RecordBatchReader`` (from
+``QueryEngine.batches`` or ``frame_batches``) and yields bytes as soon as each
+batch is written, so memory stays at one batch plus the writer's buffer however
+large the filtered set is.
+"""
+import io
+import zipfile
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+EXPORT_FORMATS = {
+    "csv": {"mime": "text/csv", "suffix": ".csv"},
+    "parquet": {"mime": "application/vnd.apache.parquet", "suffix": ".parquet"},
+    "zip": {"mime": "application/zip", "suffix": ".zip"},
+}
+BATCH_SIZE = 50_000
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink whose contents are handed out and dropped after every batch."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        chunk, self._chunks = b"".join(self._chunks), []
+        return chunk
+
+
+def frame_batches(frame, batch_size=BATCH_SIZE):
+    return pa.Table.from_pandas(frame, preserve_index=False).to_reader(batch_size)
+
+
+def iter_csv(batches):
+    sink = _Drain()
+    with pa_csv.CSVWriter(sink, batches.schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_parquet(batches):
+    sink = _Drain()
+    # One row group per batch, so each group is flushed as soon as it is written
+    with pq.ParquetWriter(sink, batches.schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_zip(batches, name="export.csv"):
+    sink = _Drain()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open(name, "w", force_zip64=True) as member:
+            for chunk in iter_csv(batches):
+                member.write(chunk)
+                yield sink.drain()
+    yield sink.drain()
+
+
+def export(batches, fmt, name="export"):
+    """Yield the encoded bytes of ``batches`` in ``fmt`` ("csv", "parquet" or "zip")."""
+    if fmt == "csv":
+        return iter_csv(batches)
+    if fmt == "parquet":
+        return iter_parquet(batches)
+    if fmt == "zip":
+        return iter_zip(batches, f"{name}.csv")
+    raise ValueError(f"Unknown export format {fmt!r}")
@@ -0,0 +1,133 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+WEEKLY_PERIOD = 7.0
+YEARLY_PERIOD = 365.25
+# Ridge penalty on the seasonal coefficients, in units of y scaled by its largest magnitude
+SEASONALITY_PENALTY = 1.0
+
+
+def fourier_terms(days, period, order):
+    angles = 2.0 * np.pi * np.outer(days, np.arange(1, order + 1)) / period
+    return np.hstack([np.sin(angles), np.cos(angles)])
+
+
+class SeasonalForecaster:
+    """Linear trend plus Fourier weekly/yearly seasonality, fit by ridge-penalised least squares.
+
+    Mirrors the parts of Prophet's interface the dashboards use: ``fit`` takes a
+    frame with ``ds``/``y`` columns, ``make_future_dataframe`` extends ``ds`` and
+    ``predict`` returns ``yhat``, ``yhat_lower``, ``yhat_upper`` and the trend and
+    seasonal components.
+    """
+
+    def __init__(self, yearly_seasonality="auto", weekly_seasonality="auto",
+                 yearly_order=10, weekly_order=3, interval_width=0.8):
+        self.yearly_seasonality = yearly_seasonality
+        self.weekly_seasonality = weekly_seasonality
+        self.yearly_order = yearly_order
+        self.weekly_order = weekly_order
+        self.interval_width = interval_width
+        self.history = None
+
+    def _enabled(self, setting, span_days, min_span_days, points, min_points):
+        # Prophet's "auto" rule (the history covers the period twice), plus two points per coefficient
+        if setting == "auto":
+            return span_days >= min_span_days and points >= min_points
+        return bool(setting)
+
+    def _design(self, ds):
+        days = (pd.to_datetime(ds) - self.start).dt.total_seconds().to_numpy() / 86400.0
+        blocks = [np.ones((len(days), 1)), (days / self.scale)[:, None]]
+        if self.weekly:
+            blocks.append(fourier_terms(days, WEEKLY_PERIOD, self.weekly_order))
+        if self.yearly:
+            blocks.append(fourier_terms(days, YEARLY_PERIOD, self.yearly_order))
+        return np.hstack(blocks)
+
+    def fit(self, df):
+        history = df[["ds", "y"]].dropna().copy()
+        history["ds"] = pd.to_datetime(history["ds"])
+        history = history.sort_values("ds").reset_index(drop=True)
+        if len(history) < 2:
+            raise ValueError("Dataframe has less than 2 non-NaN rows.")
+
+        self.start = history["ds"].iloc[0]
+        span_days = (history["ds"].iloc[-1] - self.start).total_seconds() / 86400.0
+        self.scale = max(span_days, 1.0)
+        points = len(history)
+        weekly_width, yearly_width = 2 * self.weekly_order, 2 * self.yearly_order
+        self.weekly = self._enabled(self.weekly_seasonality, span_days, 2 * WEEKLY_PERIOD,
+                                    points, 2 * (2 + weekly_width))
+        self.yearly = self._enabled(self.yearly_seasonality, span_days, 2 * YEARLY_PERIOD,
+                                    points, 2 * (2 + weekly_width * self.weekly + yearly_width))
+
+        y = history["y"].to_numpy(dtype=float)
+        self.y_scale = float(np.abs(y).max()) or 1.0
+        X = self._design(history["ds"])
+        if np.linalg.matrix_rank(X) < X.shape[1]:
+            # Drop only the Fourier block the dates cannot separate: yearly terms on a short history first,
+            # then weekly terms (e.g. every point on the same weekday), and both only if neither alone will do
+            weekly, yearly = self.weekly, self.yearly
+            for self.weekly, self.yearly in ((weekly, False), (False, yearly), (False, False)):
+                X = self._design(history["ds"])
+                if np.linalg.matrix_rank(X) == X.shape[1]:
+                    break
+
+        # Ridge rows sqrt(penalty) * I on the seasonal columns keep their coefficients bounded
+        penalty = np.zeros(X.shape[1])
+        penalty[2:] = np.sqrt(SEASONALITY_PENALTY)
+        A = np.vstack([X, np.diag(penalty)[2:]])
+        b = np.concatenate([y / self.y_scale, np.zeros(X.shape[1] - 2)])
+        self.coef, _, rank, _ = np.linalg.lstsq(A, b, rcond=None)
+        if rank < X.shape[1]:
+            raise ValueError("Not enough distinct dates to fit a trend.")
+
+        # Ridge coefficient covariance is sigma^2 (A'A)^-1 X'X (A'A)^-1, with the residual
+        # degrees of freedom taken from the effective parameter count trace(X (A'A)^-1 X')
+        ata_inv = np.linalg.pinv(A.T @ A)
+        residuals = y / self.y_scale - X @ self.coef
+        dof = max(points - float(np.trace(X @ ata_inv @ X.T)), 1.0)
+        self.sigma = float(np.sqrt(residuals @ residuals / dof))
+        self._coef_cov = ata_inv @ (X.T @ X) @ ata_inv
+        self.history = history
+        return self
+
+    def make_future_dataframe(self, periods, freq="D", include_history=True):
+        if self.history is None:
+            raise Exception("Model has not been fit.")
+        last = self.history["ds"].max()
+        dates = pd.date_range(start=last, periods=periods + 1, freq=freq)
+        dates = dates[dates > last][:periods]
+        if include_history:
+            dates = np.concatenate([self.history["ds"].unique(), dates])
+        return pd.DataFrame({"ds": dates})
+
+    def predict(self, df=None):
+        if self.history is None:
+            raise Exception("Model has not been fit.")
+        ds = self.history["ds"] if df is None else pd.to_datetime(df["ds"]).reset_index(drop=True)
+        X = self._design(ds)
+
+        forecast = pd.DataFrame({"ds": ds})
+        coef = self.coef * self.y_scale
+        forecast["trend"] = X[:, :2] @ coef[:2]
+        column = 2
+        if self.weekly:
+            width = 2 * self.weekly_order
+            forecast["weekly"] = X[:, column:column + width] @ coef[column:column + width]
+            column += width
+        if self.yearly:
+            width = 2 * self.yearly_order
+            forecast["yearly"] = X[:, column:column + width] @ coef[column:column + width]
+        forecast["yhat"] = X @ coef
+
+        # Ridge prediction interval: residual noise plus the coefficients' sandwich variance at each point
+        leverage = np.einsum("ij,jk,ik->i", X, self._coef_cov, X)
+        z = NormalDist().inv_cdf(0.5 + self.interval_width / 2.0)
+        half_width = z * self.sigma * self.y_scale * np.sqrt(1.0 + leverage)
+        forecast["yhat_lower"] = forecast["yhat"] - half_width
+        forecast["yhat_upper"] = forecast["yhat"] + half_width
+        return forecast
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from compaction import duration_seconds
+
+LEVELS = ["Country", "Region", "City"]
+RANK_METRICS = ["Views", "Watch time (hours)"]
+NO_REGION = "—"
+# Trailing state or territory abbreviation on a two-part name, e.g. "Sydney NSW, Australia"
+_STATE_SUFFIX = r"^(?P<City>.*\S)\s+(?P<Region>[A-Z]{2,3})$"
+
+
+def parse_locations(names):
+    # "City, Region, Country" -> three columns, right-aligned so "London, UK" is (London, <NA>, UK)
+    names = names.astype("string").str.strip()
+    commas = names.str.count(",")
+    head, country = names.str.rsplit(",", n=1).str[0], names.str.rsplit(",", n=1).str[-1]
+    city_part, region = head.str.rsplit(",", n=1).str[0], head.str.rsplit(",", n=1).str[-1]
+    locations = pd.DataFrame({
+        "Country": country.str.strip(),
+        "Region": region.str.strip().where(commas >= 2),
+        "City": city_part.str.strip().where(commas >= 2, head.str.strip()),
+    })
+    suffixed = locations["City"].str.extract(_STATE_SUFFIX)
+    split = locations["Region"].isna() & suffixed["City"].notna()
+    locations.loc[split, ["City", "Region"]] = suffixed.loc[split, ["City", "Region"]]
+    return locations
+
+
+class GeoRollup:
+    """City, region and country totals precomputed from the flat ``City name`` rows.
+
+    Every level is stored twice: ranked by each metric for top-k queries, and
+    grouped under its parent with a parent -> row-range index for drill-down.
+    """
+
+    def __init__(self, cities):
+        cities = cities[cities["City name"].notna()]
+        if "Average view duration (s)" in cities:
+            duration = cities["Average view duration (s)"].astype("float64")
+        else:
+            duration = duration_seconds(cities["Average view duration"]).astype("float64")
+
+        base = parse_locations(cities["City name"]).fillna({"Region": NO_REGION})
+        base["Views"] = cities["Views"].astype("float64").to_numpy()
+        base["Watch time (hours)"] = cities["Watch time (hours)"].astype("float64").to_numpy()
+        base["_weighted duration"] = (duration * cities["Views"].astype("float64")).to_numpy()
+
+        self.ranked, self.grouped, self._ranges = {}, {}, {}
+        for depth, level in enumerate(LEVELS, start=1):
+            keys = LEVELS[:depth]
+            table = base.groupby(keys, sort=False, observed=True)[
+                ["Views", "Watch time (hours)", "_weighted duration"]].sum().reset_index()
+            with np.errstate(invalid="ignore", divide="ignore"):
+                seconds = table.pop("_weighted duration") / table["Views"]
+            table["Average view duration (s)"] = seconds.round().astype("Int32")
+            location = table[keys[::-1]].astype(str)
+            table["Location"] = location.where(location != NO_REGION).apply(lambda row: ", ".join(row.dropna()), axis=1)
+
+            # Countries without regions stay reachable by drill-down but are not ranked as regions
+            ranked = table[table["Region"] != NO_REGION] if level == "Region" else table
+            self.ranked[level] = {
+                metric: ranked.sort_values(metric, ascending=False, kind="stable").reset_index(drop=True)
+                for metric in RANK_METRICS
+            }
+
+            # Children of each parent sit in one contiguous block, already ordered by views
+            parents = keys[:-1]
+            grouped = table.sort_values(parents + ["Views"], ascending=[True] * len(parents) + [False],
+                                        kind="stable").reset_index(drop=True)
+            self.grouped[level] = grouped
+            ranges = {}
+            if parents:
+                parent_keys = list(grouped[parents].itertuples(index=False, name=None))
+                for position, key in enumerate(parent_keys):
+                    start, _ = ranges.get(key, (position, position))
+                    ranges[key] = (start, position + 1)
+            self._ranges[level] = ranges
+
+    def top(self, level, k=10, by="Views"):
+        return self.ranked[level][by].head(k)
+
+    def children(self, level, parent=()):
+        # Rows of `level` under a parent key tuple, e.g. children("Region", ("USA",))
+        if level == LEVELS[0]:
+            return self.ranked[level]["Views"]
+        start, stop = self._ranges[level].get(tuple(parent), (0, 0))
+        return self.grouped[level].iloc[start:stop]
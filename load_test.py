@@ -0,0 +1,237 @@
+"""Drive one Streamlit server running FINAL.py with concurrent sessions and report rerun latency.
+
+    python load_test.py --sessions 1 2 4 8 --iterations 3
+
+A single ``streamlit run FINAL.py`` server is started on the checked-in CSVs
+and pinned to ``--cpus`` to model the CPU budget of one pod. Each simulated
+session is a websocket client speaking Streamlit's browser protocol: it sends
+rerun requests carrying its widget values and waits for the script to finish,
+so every session shares the server's caches, script threads and memory exactly
+as browser tabs would. An untimed session warms the caches first; RSS growth
+is the server's resident memory after a level minus before it, per session.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+APP_PATH = Path(__file__).resolve().parent / "FINAL.py"
+WIDGET_TYPES = ("selectbox", "text_input")
+
+# (widget type, label prefix, value); a selectbox value is an option index, None picks one at random
+INTERACTIONS = {
+    "audience": [
+        ("text_input", "Enter a City", "york"),
+        ("text_input", "Enter a City", "london"),
+        ("text_input", "Enter a City", "ca"),
+    ],
+    "content": [
+        ("selectbox", "Select a Category", None),
+        ("text_input", "Enter a video title", "border"),
+        ("selectbox", "Select a Category", None),
+        ("text_input", "Enter a video title", "episode"),
+    ],
+    "strategy": [
+        ("selectbox", "Baseline", None),
+        ("text_input", "Search video titles", "alaska"),
+        ("selectbox", "Select a Video Title", None),
+        ("text_input", "Search video titles", ""),
+        ("selectbox", "Select a Video Title", None),
+    ],
+}
+
+
+def rss_mb(pid):
+    # Resident memory of the server process from /proc; NaN where /proc is unavailable
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return float("nan")
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(port, cpus, timeout):
+    env = dict(os.environ, DANGERTV_LOCAL_DATA="1")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(APP_PATH), "--server.headless", "true",
+         "--server.port", str(port), "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(server.pid, cpus)
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"Streamlit server did not come up on port {port}")
+
+
+class Session:
+    """One browser tab: a websocket to the server plus the widget values it has set."""
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.connection = None
+        self.widgets = {}
+        self.states = {}
+        self.errors = 0
+        self._messages = {}
+
+    async def rerun(self):
+        if self.connection is None:
+            self.connection = await websocket_connect(self.url)
+        request = BackMsg()
+        request.rerun_script.widget_states.widgets.extend(self.states.values())
+        started = time.perf_counter()
+        await self.connection.write_message(request.SerializeToString(), binary=True)
+
+        widgets = {}
+        while True:
+            payload = await asyncio.wait_for(self.connection.read_message(), self.timeout)
+            if payload is None:
+                raise RuntimeError("Server closed the session")
+            message = ForwardMsg.FromString(payload)
+            if message.hash:
+                self._messages[message.hash] = message
+            if message.WhichOneof("type") == "ref_hash":
+                # Elements the server has already sent this session arrive as references
+                message = self._messages[message.ref_hash]
+            kind = message.WhichOneof("type")
+            if kind == "script_finished":
+                break
+            if kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                element = message.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    widgets.setdefault((element_type, widget.label), widget)
+                elif element_type == "exception":
+                    self.errors += 1
+        self.widgets = widgets
+        return time.perf_counter() - started
+
+    def widget(self, kind, label):
+        for (widget_kind, widget_label), widget in self.widgets.items():
+            if widget_kind == kind and widget_label.startswith(label):
+                return widget
+        return None
+
+    def set(self, widget, kind, value):
+        state = WidgetState(id=widget.id)
+        if kind == "selectbox":
+            state.int_value = value
+        else:
+            state.string_value = value
+        self.states[widget.id] = state
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+async def run_session(url, session_id, iterations, timeout, seed):
+    rng = random.Random(seed + session_id)
+    session = Session(url, timeout)
+    latencies = []
+    try:
+        latencies.append(await session.rerun())
+        for _ in range(iterations):
+            # Tab switches are client-side in Streamlit, so a "tab visit" is that tab's widget script
+            for tab in rng.sample(list(INTERACTIONS), len(INTERACTIONS)):
+                for kind, label, value in INTERACTIONS[tab]:
+                    widget = session.widget(kind, label)
+                    if widget is None:
+                        continue
+                    if kind == "selectbox":
+                        if not widget.options:
+                            continue
+                        value = rng.randrange(len(widget.options)) if value is None else value
+                    session.set(widget, kind, value)
+                    latencies.append(await session.rerun())
+    finally:
+        session.close()
+    return latencies, session.errors
+
+
+async def run_level(url, server_pid, sessions, iterations, timeout, seed):
+    rss_before = rss_mb(server_pid)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_session(url, i, iterations, timeout, seed) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    rss_after = rss_mb(server_pid)
+
+    latencies = np.concatenate([np.asarray(result[0]) for result in results]) * 1000.0
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": sum(result[1] for result in results),
+        "throughput (reruns/s)": len(latencies) / elapsed,
+        "p50 (ms)": p50,
+        "p95 (ms)": p95,
+        "p99 (ms)": p99,
+        "RSS growth/session (MB)": (rss_after - rss_before) / sessions,
+    }
+
+
+async def run_levels(url, server_pid, levels, iterations, timeout, seed):
+    # An untimed pass fills the server's caches, so the timed levels see steady-state reruns
+    await run_session(url, -1, 1, timeout, seed)
+    return [await run_level(url, server_pid, n, iterations, timeout, seed) for n in levels]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Concurrent session counts to test, in order.")
+    parser.add_argument("--iterations", type=int, default=2, help="Passes over every tab script per session.")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds allowed per rerun.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cpus", type=int, nargs="*", default=[0],
+                        help="CPU ids the server is pinned to (the pod's budget); pass none to disable pinning.")
+    parser.add_argument("--port", type=int, default=None, help="Server port (default: a free one).")
+    parser.add_argument("--output", default=None, help="Optional CSV path for the report.")
+    args = parser.parse_args(argv)
+
+    port = args.port or _free_port()
+    server = start_server(port, args.cpus, args.timeout)
+    try:
+        url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        levels = asyncio.run(run_levels(url, server.pid, args.sessions, args.iterations, args.timeout, args.seed))
+    finally:
+        server.terminate()
+        server.wait()
+    report = pd.DataFrame(levels)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.1f}"))
+    if args.output:
+        report.to_csv(args.output, index=False)
+    return 0 if report["errors"].eq(0).all() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+import derived_metrics
+from categories import CATEGORIES
+from datasets import DATA_DIR, FILES
+
+
+def _literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def category_case(column='"Video title"'):
+    # SQL twin of categories.assign_category: first category with a keyword hit wins
+    title = f"lower(coalesce(CAST({column} AS VARCHAR), ''))"
+    branches = []
+    for category, keywords in CATEGORIES.items():
+        hits = " OR ".join(f"contains({title}, {_literal(keyword.lower())})" for keyword in keywords)
+        branches.append(f"WHEN {hits} THEN {_literal(category)}")
+    return "CASE " + " ".join(branches) + " ELSE 'Other' END"
+
+
+# Content sources may carry precomputed labels (e.g. from category_model.py) that replace the keyword CASE
+MODEL_CATEGORY = "Model category"
+CONTENT_VIEW = """
+        SELECT * {exclude},
+               {category} AS Category,
+               try_strptime(CAST("Video publish time" AS VARCHAR), '%b %d, %Y')::DATE AS "Publish date"
+        FROM content_source
+    """
+
+# Derived views layered over the raw `<name>_source` relations
+DERIVED_VIEWS = {
+    "content": CONTENT_VIEW.format(exclude="", category=category_case()),
+    "cities": "SELECT * FROM cities_source",
+    "age": "SELECT * FROM age_source",
+    "gender": "SELECT * FROM gender_source",
+    "demographics": """
+        SELECT 'age' AS Dimension, "Viewer age" AS Segment, "Views (%)", "Watch time (hours) (%)",
+               "Average percentage viewed (%)"
+        FROM age_source
+        UNION ALL
+        SELECT 'gender', "Viewer gender", "Views (%)", "Watch time (hours) (%)", "Average percentage viewed (%)"
+        FROM gender_source
+    """,
+    "subscriptions": "SELECT * FROM subscriptions_source",
+    "subscription_daily": "SELECT * FROM subscription_daily_source",
+    "strategy": "SELECT * FROM strategy_source",
+    "channel_daily": """
+        SELECT "Date", "Views", "Watch time (hours)", "Estimated revenue (USD)"
+        FROM strategy_source
+        WHERE "Date" IS NOT NULL
+    """,
+}
+VIEW_SOURCES = {
+    "content": ["content"], "cities": ["cities"], "age": ["age"], "gender": ["gender"],
+    "demographics": ["age", "gender"], "subscriptions": ["subscriptions"],
+    "subscription_daily": ["subscription_daily"], "strategy": ["strategy"], "channel_daily": ["strategy"],
+}
+
+
+def local_sources(data_dir=DATA_DIR):
+    # Prefer a Parquet copy of an export when one sits next to the CSV
+    sources = {}
+    for name, filename in FILES.items():
+        csv_path = Path(data_dir) / filename
+        parquet_path = csv_path.with_suffix(".parquet")
+        if parquet_path.exists():
+            sources[name] = parquet_path
+        elif csv_path.exists():
+            sources[name] = csv_path
+    return sources
+
+
+class QueryEngine:
+    """In-process DuckDB database exposing the dashboard datasets as SQL views.
+
+    ``sources`` maps dataset names (the keys of ``datasets.FILES``) to a CSV or
+    Parquet path, which DuckDB scans lazily with predicate pushdown, or to an
+    already loaded DataFrame, which is copied once into DuckDB's columnar storage.
+    """
+
+    def __init__(self, sources=None):
+        self.connection = duckdb.connect()
+        sources = local_sources() if sources is None else sources
+        for name, source in sources.items():
+            if isinstance(source, pd.DataFrame):
+                # Registered frames are private to this connection, so load them into a table cursors can see
+                self.connection.register("frame", source)
+                self.connection.execute(f"CREATE TABLE {name}_source AS SELECT * FROM frame")
+                self.connection.unregister("frame")
+            else:
+                reader = "read_parquet" if str(source).endswith(".parquet") else "read_csv"
+                self.connection.execute(f"CREATE VIEW {name}_source AS SELECT * FROM {reader}({_literal(source)})")
+        self.views = [view for view, needs in VIEW_SOURCES.items() if all(need in sources for need in needs)]
+        for view in self.views:
+            self.connection.execute(f"CREATE VIEW {view} AS {self._view_sql(view)}")
+
+    def _view_sql(self, view):
+        if view == "content":
+            columns = self.connection.execute("SELECT * FROM content_source LIMIT 0").fetchdf().columns
+            if MODEL_CATEGORY in columns:
+                return CONTENT_VIEW.format(exclude=f'EXCLUDE ("{MODEL_CATEGORY}")', category=f'"{MODEL_CATEGORY}"')
+        return DERIVED_VIEWS[view]
+
+    def query(self, sql, params=None):
+        # A cursor per call keeps concurrent Streamlit sessions off a shared connection
+        with self.connection.cursor() as cursor:
+            return cursor.execute(sql, params).df()
+
+    def batches(self, sql, params=None, batch_size=50_000):
+        # Arrow record batches streamed off a private cursor, for exports that should not materialise a frame
+        cursor = self.connection.cursor()
+        reader = cursor.execute(sql, params).fetch_record_batch(batch_size)
+
+        def stream():
+            try:
+                yield from reader
+            finally:
+                cursor.close()
+        return pa.RecordBatchReader.from_batches(reader.schema, stream())
+
+
+# The dashboard's tab computations, expressed over the views
+def category_summary(engine):
+    # Totals plus ratio-of-sums metrics from the registry, so CTR is weighted by impressions
+    columns = engine.query("SELECT * FROM content LIMIT 0").columns
+    return engine.query(derived_metrics.summary_sql("content", "Category", columns))
+
+
+def top_videos(engine, category, limit=10):
+    return engine.query("""
+        SELECT "Video title", "Views", "Watch time (hours)", "Impressions click-through rate (%)"
+        FROM content
+        WHERE Category = ?
+        ORDER BY "Views" DESC
+        LIMIT ?
+    """, [category, limit])
+
+
+# Substring searches shared by the full-result, paged and export paths
+SEARCHES = {
+    "videos": {
+        "select": '"Video title", Category, "Views", "Watch time (hours)", "Impressions click-through rate (%)"',
+        "source": "content", "column": "Video title",
+        "sort": ["Views", "Watch time (hours)", "Impressions click-through rate (%)", "Video title"],
+    },
+    "cities": {
+        "select": '"City name", "Views", "Watch time (hours)", COLUMNS(\'^Average view duration\')',
+        "source": "cities", "column": "City name",
+        "sort": ["Views", "Watch time (hours)", "City name"],
+    },
+}
+
+
+def search_sql(kind, order_by=None, descending=True, paged=False):
+    search = SEARCHES[kind]
+    sql = f"""
+        SELECT {search["select"]}
+        FROM {search["source"]}
+        WHERE contains(lower("{search["column"]}"), lower(?))
+    """
+    if order_by is not None:
+        if order_by not in search["sort"]:
+            raise ValueError(f"Cannot sort {kind} by {order_by!r}")
+        # The name breaks ties so consecutive pages never overlap
+        sql += f'ORDER BY "{order_by}" {"DESC" if descending else "ASC"} NULLS LAST, "{search["column"]}"\n'
+    if paged:
+        sql += "LIMIT ? OFFSET ?"
+    return sql
+
+
+def search_count(engine, kind, text):
+    search = SEARCHES[kind]
+    return int(engine.query(f"""
+        SELECT count(*) AS matches
+        FROM {search["source"]}
+        WHERE contains(lower("{search["column"]}"), lower(?))
+    """, [text])["matches"].iat[0])
+
+
+def search_page(engine, kind, text, order_by, descending=True, page=1, page_size=25):
+    # Only one page of rows leaves DuckDB; the sort runs as a top-N over the matches
+    return engine.query(search_sql(kind, order_by, descending, paged=True), [text, page_size, (page - 1) * page_size])
+
+
+def top_cities(engine, by="Views", limit=10):
+    if by not in ("Views", "Watch time (hours)"):
+        raise ValueError(f"Cannot rank cities by {by!r}")
+    return engine.query(f"""
+        SELECT "City name", "Views", "Watch time (hours)", COLUMNS('^Average view duration')
+        FROM cities
+        ORDER BY "{by}" DESC
+        LIMIT ?
+    """, [limit])
+
+
+def weekday_averages(engine):
+    return engine.query("""
+        SELECT dayname("Date") AS "Day of Week",
+               avg("Views") AS "Views",
+               avg("Watch time (hours)") AS "Watch time (hours)",
+               avg("Estimated revenue (USD)") AS "Estimated revenue (USD)"
+        FROM channel_daily
+        GROUP BY ALL
+        ORDER BY isodow(min("Date"))
+    """).set_index("Day of Week")
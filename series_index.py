@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+from compaction import duration_seconds
+
+SEGMENT_SEPARATOR = r"\s*\|\s*|\s+[-–]\s+"
+SEASON_EPISODE = r"(?i)\bseason\s*(?P<Season>\d+)(?:\s*[-–,]?\s*(?:episode|eps?\.?)\s*(?P<Episode>\d+))?"
+EPISODE_ONLY = r"(?i)\b(?:episode|eps?\.?)\s*(?P<Episode>\d+)\b"
+PART = r"(?i)\bpart\s+(?P<Part>\d+|[ivx]+)\b"
+ROMAN = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8, "ix": 9, "x": 10}
+# Labels that say how a video was cut or who posted it, not what it is
+BOILERPLATE = r"(?i)^(?:full (?:episode|length|run)s?(?: documentary)?(?: \d{4})?|(?:nature )?documentary|dangertv\b.*)$"
+SERIES_METRICS = ["Views", "Watch time (hours)", "Subscribers", "Estimated revenue (USD)", "Impressions"]
+
+
+def _key(values):
+    return values.str.lower().str.replace("’", "'", regex=False).str.replace(r"[^\w' ]+", "", regex=True).str.strip()
+
+
+def _row_ranges(keys):
+    # Start/stop of each run of equal keys in an already grouped column
+    keys = np.asarray(keys)
+    is_start = np.ones(len(keys), dtype=bool)
+    is_start[1:] = keys[1:] != keys[:-1]
+    starts = np.flatnonzero(is_start)
+    stops = np.append(starts[1:], len(keys))
+    return dict(zip(keys[starts].tolist(), zip(starts.tolist(), stops.tolist())))
+
+
+def parse_titles(titles):
+    """Split titles into Series, Episode title, Season, Episode and Part in a handful of vectorised passes.
+
+    The series is the title segment shared by the most videos in the catalog,
+    provided at least two videos share it, so "Episode | Series" and
+    "Series | Episode | Season 1 Episode 4" layouts resolve the same way.
+    """
+    titles = titles.astype("string").str.strip()
+    cleaned = titles.str.replace(r"#\w+", "", regex=True).str.strip()
+
+    numbers = cleaned.str.extract(SEASON_EPISODE)
+    episode_only = cleaned.str.extract(EPISODE_ONLY)["Episode"]
+    part = cleaned.str.extract(PART)["Part"].str.lower()
+    parsed = pd.DataFrame({
+        "Season": pd.to_numeric(numbers["Season"]).astype("Int16"),
+        "Episode": pd.to_numeric(numbers["Episode"].fillna(episode_only)).astype("Int16"),
+        "Part": pd.to_numeric(part.map(ROMAN).fillna(part), errors="coerce").astype("Int16"),
+    }, index=titles.index)
+
+    # One row per segment; the season/episode text is cut out of whichever segment carries it
+    segments = cleaned.str.split(SEGMENT_SEPARATOR, regex=True).explode().astype("string")
+    segments = segments.str.replace(SEASON_EPISODE, "", regex=True).str.replace(EPISODE_ONLY, "", regex=True)
+    segments = segments.str.strip(" -–:,").str.strip()
+    segments = segments[(segments != "") & segments.notna() & ~segments.str.fullmatch(BOILERPLATE).fillna(False)]
+    segments = pd.DataFrame({"Segment": segments, "Key": _key(segments),
+                             "Position": segments.groupby(level=0).cumcount()})
+
+    # Catalog frequency of each segment, counted once per title
+    segments["Titles"] = segments["Key"].map(
+        segments.reset_index().drop_duplicates(["index", "Key"])["Key"].value_counts())
+    ranked = segments.reset_index().sort_values(["index", "Titles", "Position"], ascending=[True, False, True],
+                                                kind="stable")
+    best = ranked.drop_duplicates("index").set_index("index")
+    best = best[best["Titles"] >= 2]
+
+    # A series keeps the spelling used by the first title that carries it
+    spelling = best.drop_duplicates("Key").set_index("Key")["Segment"]
+    parsed["Series"] = best["Key"].map(spelling).reindex(titles.index).astype("string")
+    remaining = ranked[~ranked.set_index(["index", "Key"]).index.isin(best.reset_index().set_index(["index", "Key"]).index)]
+    parsed["Episode title"] = (remaining.sort_values(["index", "Position"], kind="stable")
+                               .drop_duplicates("index").set_index("index")["Segment"]
+                               .reindex(titles.index).astype("string"))
+    parsed["Episode title"] = parsed["Episode title"].fillna(parsed["Series"])
+    return parsed[["Series", "Episode title", "Season", "Episode", "Part"]]
+
+
+class SeriesIndex:
+    """Series-level totals, per-season trends and episode rankings parsed once from the content table.
+
+    ``episodes`` is sorted by series and then views and ``seasons`` by series and
+    season, so each series owns one contiguous block of rows in both, found
+    through a series -> row-range lookup.
+    """
+
+    def __init__(self, content):
+        content = content[content["Video title"].notna()]
+        if "Average view duration (s)" in content:
+            duration = content["Average view duration (s)"].astype("float64")
+        else:
+            duration = duration_seconds(content["Average view duration"]).astype("float64")
+
+        episodes = parse_titles(content["Video title"])
+        episodes.insert(0, "Video title", content["Video title"].astype("string"))
+        for metric in SERIES_METRICS:
+            episodes[metric] = content[metric].astype("float64")
+        episodes["Average view duration (s)"] = duration
+        episodes["Impressions click-through rate (%)"] = content["Impressions click-through rate (%)"].astype("float64")
+        episodes = episodes[episodes["Series"].notna()]
+
+        episodes = episodes.sort_values(["Series", "Views"], ascending=[True, False], kind="stable").reset_index(drop=True)
+        episodes["Rank"] = episodes.groupby("Series", sort=False).cumcount() + 1
+        self.episodes = episodes
+
+        self._ranges = _row_ranges(episodes["Series"].to_numpy(dtype=object))
+
+        # Weighted by views / impressions so per-series averages match the pooled videos
+        weighted = episodes.assign(
+            _duration=episodes["Average view duration (s)"] * episodes["Views"],
+            _clicks=episodes["Impressions click-through rate (%)"] * episodes["Impressions"])
+        self.totals = self._summarise(weighted, ["Series"]).sort_values("Views", ascending=False, kind="stable")
+        self.totals = self.totals.reset_index(drop=True)
+        self.seasons = self._summarise(weighted[weighted["Season"].notna()], ["Series", "Season"])
+        self._season_ranges = _row_ranges(self.seasons["Series"].to_numpy(dtype=object))
+
+    @staticmethod
+    def _summarise(weighted, keys):
+        summary = weighted.groupby(keys, sort=True, observed=True).agg(
+            Videos=("Video title", "size"), **{metric: (metric, "sum") for metric in SERIES_METRICS},
+            _duration=("_duration", "sum"), _clicks=("_clicks", "sum")).reset_index()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            summary["Views per video"] = summary["Views"] / summary["Videos"]
+            summary["Average view duration (s)"] = (summary.pop("_duration") / summary["Views"]).round()
+            summary["Impressions click-through rate (%)"] = summary.pop("_clicks") / summary["Impressions"]
+        return summary
+
+    def __contains__(self, series):
+        return series in self._ranges
+
+    @property
+    def names(self):
+        return self.totals["Series"].tolist()
+
+    def top(self, k=10, by="Views"):
+        return self.totals.nlargest(k, by)
+
+    def episodes_of(self, series):
+        # Episodes of one series, best first
+        start, stop = self._ranges.get(series, (0, 0))
+        return self.episodes.iloc[start:stop]
+
+    def season_trend(self, series):
+        # Season-by-season totals of one series, in season order
+        start, stop = self._season_ranges.get(series, (0, 0))
+        return self.seasons.iloc[start:stop]
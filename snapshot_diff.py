@@ -0,0 +1,123 @@
+"""What moved between two snapshots of the content and city exports.
+
+    python snapshot_diff.py                      # previous snapshot -> latest
+    python snapshot_diff.py OLD NEW --dataset cities --top 20
+
+Rows are matched on the export's own ID (``Content`` video ID, ``Cities``
+place ID). Both sides are aligned on the union of IDs once; a hash of each
+row's metric values marks unchanged rows, and the per-entity deltas for every
+metric come out of the same aligned arrays.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from snapshots import SNAPSHOT_ROOT, Snapshot, latest_version, list_versions
+
+DIFF_DATASETS = {
+    "content": {"key": "Content", "label": "Video title"},
+    "cities": {"key": "Cities", "label": "City name"},
+}
+DIFF_METRICS = ["Views", "Watch time (hours)", "Subscribers", "Estimated revenue (USD)"]
+STATUSES = ["added", "removed", "changed", "unchanged"]
+
+
+def _aligned(frame, key, label, metrics, ids):
+    frame = frame.drop_duplicates(key).set_index(key)
+    positions = frame.index.get_indexer(ids)
+    present = positions >= 0
+    values = frame[metrics].to_numpy(dtype="float64", na_value=np.nan)[positions]
+    values[~present] = np.nan
+    labels = frame[label].astype("string").to_numpy(dtype=object)[positions]
+    labels[~present] = None
+    hashes = pd.util.hash_pandas_object(frame[metrics].astype("float64"), index=False).to_numpy()[positions]
+    return present, values, labels, hashes
+
+
+class SnapshotDiff:
+    """Per-entity old/new/delta table for one dataset between two exports."""
+
+    def __init__(self, old, new, dataset="content"):
+        key, label = DIFF_DATASETS[dataset]["key"], DIFF_DATASETS[dataset]["label"]
+        self.dataset = dataset
+        self.metrics = [metric for metric in DIFF_METRICS if metric in old and metric in new]
+        ids = pd.Index(old[key].astype(str)).union(pd.Index(new[key].astype(str)))
+        old = old.assign(**{key: old[key].astype(str)})
+        new = new.assign(**{key: new[key].astype(str)})
+
+        in_old, old_values, old_labels, old_hashes = _aligned(old, key, label, self.metrics, ids)
+        in_new, new_values, new_labels, new_hashes = _aligned(new, key, label, self.metrics, ids)
+        status = np.select([in_new & ~in_old, in_old & ~in_new, old_hashes != new_hashes],
+                           STATUSES[:3], STATUSES[3])
+
+        # Entities missing on one side count as zero there, so added/removed rows carry their full value as delta
+        deltas = np.nan_to_num(new_values) - np.nan_to_num(old_values)
+        columns = {key: ids, label: np.where(in_new, new_labels, old_labels),
+                   "Status": pd.Categorical(status, categories=STATUSES)}
+        for j, metric in enumerate(self.metrics):
+            columns[f"{metric} (old)"] = old_values[:, j]
+            columns[f"{metric} (new)"] = new_values[:, j]
+            columns[f"{metric} (delta)"] = deltas[:, j]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                columns[f"{metric} (change %)"] = 100.0 * deltas[:, j] / old_values[:, j]
+        self.table = pd.DataFrame(columns)
+        self.key, self.label = key, label
+
+    def status(self, status):
+        return self.table[self.table["Status"] == status].reset_index(drop=True)
+
+    def movers(self, metric="Views", k=10, direction="up"):
+        # Largest gains (or losses) among entities present in both exports
+        both = self.table[self.table["Status"].isin(["changed", "unchanged"])]
+        column = f"{metric} (delta)"
+        ranked = both.nlargest(k, column) if direction == "up" else both.nsmallest(k, column)
+        return ranked[[self.key, self.label, f"{metric} (old)", f"{metric} (new)", column, f"{metric} (change %)"]]
+
+    def summary(self):
+        # Entity counts and summed deltas per status
+        deltas = [f"{metric} (delta)" for metric in self.metrics]
+        summary = self.table.groupby("Status", observed=False)[deltas].sum()
+        summary.insert(0, "Entities", self.table["Status"].value_counts().reindex(STATUSES).fillna(0).astype(int))
+        return summary
+
+
+def diff_snapshots(old_version, new_version, dataset="content", root=SNAPSHOT_ROOT):
+    old, new = Snapshot(root / old_version), Snapshot(root / new_version)
+    return SnapshotDiff(old.frame(dataset), new.frame(dataset), dataset)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old", nargs="?", help="Older snapshot version (default: the one before NEW).")
+    parser.add_argument("new", nargs="?", help="Newer snapshot version (default: the latest).")
+    parser.add_argument("--dataset", choices=list(DIFF_DATASETS), default="content")
+    parser.add_argument("--metric", choices=DIFF_METRICS, default="Views")
+    parser.add_argument("--top", type=int, default=10, help="Movers to list in each direction.")
+    args = parser.parse_args(argv)
+
+    versions = list_versions()
+    new = args.new or latest_version()
+    older = [version for version in versions if version < (new or "")]
+    old = args.old or (older[-1] if older else None)
+    if not old or not new:
+        print("Need two published snapshots to diff; run snapshots.py after each export.", file=sys.stderr)
+        return 1
+
+    diff = diff_snapshots(old, new, args.dataset)
+    if args.metric not in diff.metrics:
+        parser.error(f"--metric {args.metric!r} is not in the {args.dataset} export (choose from {', '.join(diff.metrics)})")
+    with pd.option_context("display.width", 200, "display.max_colwidth", 60):
+        print(f"{args.dataset}: {old} -> {new}\n")
+        print(diff.summary().to_string(), end="\n\n")
+        print(f"Top {args.metric} gains:\n{diff.movers(args.metric, args.top, 'up').to_string(index=False)}\n")
+        print(f"Top {args.metric} losses:\n{diff.movers(args.metric, args.top, 'down').to_string(index=False)}\n")
+        for status in ("added", "removed"):
+            rows = diff.status(status)
+            print(f"{status.capitalize()} ({len(rows)}):\n{rows[[diff.key, diff.label]].head(args.top).to_string(index=False)}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
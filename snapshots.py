@@ -0,0 +1,205 @@
+"""Offline precompute pipeline writing versioned, memory-mappable snapshots of the derived data.
+
+    python snapshots.py --keep 3
+
+Each run reads the raw exports, computes the derived tables (categorised
+content, category summary, top-N lists, city rankings, daily series) and writes
+them as uncompressed Arrow IPC files plus a ``manifest.json`` into
+``artifacts/snapshots/<version>/``. The directory is assembled under a temporary
+name and renamed into place, then the ``LATEST`` pointer is replaced atomically,
+so readers only ever see complete snapshots, and all but the newest ``--keep``
+are pruned. Readers only serve a snapshot whose manifest was written by the
+current code (``serving_version``) and fall back to live queries otherwise.
+"""
+import argparse
+import functools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+import query_engine
+from compaction import compact
+from datasets import DATA_DIR, code_version, content_version
+
+SNAPSHOT_ROOT = DATA_DIR / "artifacts" / "snapshots"
+LATEST_POINTER = "LATEST"
+TOP_VIDEOS_PER_CATEGORY = 10
+TOP_CITIES = 20
+
+# Columns stay Arrow-backed on the way back to pandas, so frames are views of the memory-mapped buffers.
+# Strings keep the dtype compaction gives them; dictionary columns still become (small) Categoricals.
+ARROW_STRINGS = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+
+
+def arrow_dtype(arrow_type):
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return ARROW_STRINGS.get(arrow_type) or pd.ArrowDtype(arrow_type)
+
+
+def derived_tables(engine):
+    return {
+        "content": compact(engine.query("SELECT * FROM content")),
+        "category_summary": query_engine.category_summary(engine),
+        "top_videos": engine.query(f"""
+            SELECT Category, "Video title", "Views", "Watch time (hours)", "Impressions click-through rate (%)"
+            FROM content
+            QUALIFY row_number() OVER (PARTITION BY Category ORDER BY "Views" DESC) <= {TOP_VIDEOS_PER_CATEGORY}
+            ORDER BY Category, "Views" DESC
+        """),
+        "cities": compact(engine.query("SELECT * FROM cities")),
+        "top_cities_views": query_engine.top_cities(engine, by="Views", limit=TOP_CITIES),
+        "top_cities_watch_time": query_engine.top_cities(engine, by="Watch time (hours)", limit=TOP_CITIES),
+        "age": engine.query("SELECT * FROM age"),
+        "gender": engine.query("SELECT * FROM gender"),
+        "subscriptions": engine.query("SELECT * FROM subscriptions"),
+        "subscription_daily": engine.query('SELECT * FROM subscription_daily ORDER BY "Date"'),
+        "channel_daily": engine.query('SELECT * FROM channel_daily ORDER BY "Date"'),
+        "weekday_averages": query_engine.weekday_averages(engine).reset_index(),
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def current_code_version():
+    # The modules cannot change under a running process, so hash them once
+    return code_version()
+
+
+def build_snapshot(data_dir=DATA_DIR, root=SNAPSHOT_ROOT, keep=3):
+    data_dir, root = Path(data_dir), Path(root)
+    sources = query_engine.local_sources(data_dir)
+    source_versions = {name: content_version(Path(path).read_bytes()) for name, path in sources.items()}
+    data_version = content_version(json.dumps(source_versions, sort_keys=True).encode())
+    version = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{data_version}"
+
+    root.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{version}.", dir=root))
+    try:
+        artifacts = {}
+        for name, frame in derived_tables(query_engine.QueryEngine(sources)).items():
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            with pa.OSFile(str(staging / f"{name}.arrow"), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            artifacts[name] = {"file": f"{name}.arrow", "rows": table.num_rows, "columns": table.column_names}
+
+        manifest = {
+            "version": version,
+            "created": time.time(),
+            "code_version": current_code_version(),
+            "data_version": data_version,
+            "sources": {name: {"file": Path(path).name, "version": source_versions[name]}
+                        for name, path in sources.items()},
+            "artifacts": artifacts,
+        }
+        (staging / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        staging.chmod(0o755)
+        os.replace(staging, root / version)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    publish(version, root)
+    prune(keep, root)
+    return version
+
+
+def publish(version, root=SNAPSHOT_ROOT):
+    pointer = Path(root) / LATEST_POINTER
+    partial = pointer.with_name(f".{LATEST_POINTER}.{os.getpid()}")
+    partial.write_text(version)
+    os.replace(partial, pointer)
+
+
+def latest_version(root=SNAPSHOT_ROOT):
+    try:
+        return (Path(root) / LATEST_POINTER).read_text().strip() or None
+    except OSError:
+        return None
+
+
+def is_compatible(manifest):
+    # Tables written by other code may differ in schema or derivation, so only snapshots of this code are served
+    return manifest.get("code_version") == current_code_version()
+
+
+def serving_version(root=SNAPSHOT_ROOT):
+    """The latest snapshot's version if the current code built it, otherwise None (callers compute live)."""
+    version = latest_version(root)
+    if version is None:
+        return None
+    try:
+        manifest = json.loads((Path(root) / version / "manifest.json").read_text())
+    except (OSError, ValueError):
+        return None
+    return version if is_compatible(manifest) else None
+
+
+def list_versions(root=SNAPSHOT_ROOT):
+    # Published snapshot directories, oldest first (staging directories start with a dot)
+    if not Path(root).is_dir():
+        return []
+    return sorted(path.name for path in Path(root).iterdir() if path.is_dir() and not path.name.startswith("."))
+
+
+def prune(keep, root=SNAPSHOT_ROOT):
+    # Older snapshots can go even while mapped: unlinked files stay readable until unmapped
+    latest = latest_version(root)
+    versions = list_versions(root)
+    for version in versions[:-keep] if keep else []:
+        if version != latest:
+            shutil.rmtree(Path(root) / version, ignore_errors=True)
+
+
+class Snapshot:
+    """Read-only view of one snapshot directory; tables are memory-mapped on first use."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.manifest = json.loads((self.path / "manifest.json").read_text())
+        self.version = self.manifest["version"]
+        self._tables = {}
+        self._frames = {}
+
+    def __contains__(self, name):
+        return name in self.manifest["artifacts"]
+
+    def table(self, name):
+        if name not in self._tables:
+            artifact = self.manifest["artifacts"][name]
+            source = pa.memory_map(str(self.path / artifact["file"]), "r")
+            table = pa.ipc.open_file(source).read_all()
+            if table.column_names != artifact["columns"]:
+                raise ValueError(f"Snapshot {self.version} table {name!r} does not match its manifest")
+            self._tables[name] = table
+        return self._tables[name]
+
+    def frame(self, name):
+        # Shared between sessions: callers must treat the frame as read-only
+        if name not in self._frames:
+            self._frames[name] = self.table(name).to_pandas(types_mapper=arrow_dtype)
+        return self._frames[name]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory holding the raw exports.")
+    parser.add_argument("--root", default=SNAPSHOT_ROOT, help="Directory the snapshots are written to.")
+    parser.add_argument("--keep", type=int, default=3, help="Snapshots to retain (0 keeps all).")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    version = build_snapshot(args.data_dir, args.root, args.keep)
+    print(f"Published snapshot {version} in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
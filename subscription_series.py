@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+STATUSES = ["Subscribed", "Not subscribed"]
+SHARE_WINDOWS = (7, 28)
+ROLLUPS = {"Daily": None, "Weekly": "W-SUN", "Monthly": "M"}
+
+
+class SubscriptionSeries:
+    """Daily views per subscription status with period rollups, rolling shares and O(1) range totals.
+
+    Views are laid out on a gap-free calendar (missing days count as zero) and
+    accumulated into prefix sums once; every rollup, rolling window and date
+    range total is a difference of two prefix rows.
+    """
+
+    def __init__(self, daily, windows=SHARE_WINDOWS):
+        daily = daily.assign(Date=pd.to_datetime(daily["Date"]))
+        views = daily.pivot_table(index="Date", columns="Subscription status", values="Views", aggfunc="sum")
+        self.dates = pd.date_range(views.index.min(), views.index.max(), freq="D")
+        self.statuses = [status for status in STATUSES if status in views.columns]
+        values = views.reindex(index=self.dates, columns=self.statuses).fillna(0.0).to_numpy(dtype=float)
+        self._sums = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+
+        self.rollups = {name: self._rollup(frequency) for name, frequency in ROLLUPS.items()}
+
+        # Rolling windows ending on each day, truncated at the start of the series
+        stops = np.arange(1, len(self.dates) + 1)
+        shares = {}
+        for window in windows:
+            sums = self._sums[stops] - self._sums[np.maximum(stops - window, 0)]
+            shares[f"{window}-day share (%)"] = self._share(sums)
+        self.rolling_shares = pd.DataFrame(shares, index=pd.Index(self.dates, name="Date"))
+
+    def _share(self, sums):
+        total = sums.sum(axis=-1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return 100.0 * sums[..., self.statuses.index("Subscribed")] / total
+
+    def _periods(self, frequency):
+        # Period boundaries on the calendar turn each period total into one prefix-sum difference
+        if frequency is None:
+            return self.dates, np.arange(len(self.dates))
+        periods = self.dates.to_period(frequency)
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        return periods[starts].start_time, starts
+
+    def _rollup(self, frequency, first=None, stop=None):
+        labels, starts = self._periods(frequency)
+        stops = np.append(starts[1:], len(self.dates))
+        if first is not None:
+            # Boundary periods only count the days inside [first, stop)
+            overlaps = (stops > first) & (starts < stop)
+            labels = labels[overlaps]
+            starts = np.maximum(starts[overlaps], first)
+            stops = np.minimum(stops[overlaps], stop)
+        sums = self._sums[stops] - self._sums[starts]
+        rollup = pd.DataFrame(sums, index=pd.Index(labels, name="Date"), columns=self.statuses)
+        rollup["Total"] = sums.sum(axis=1)
+        rollup["Subscribed share (%)"] = self._share(sums)
+        return rollup
+
+    def _boundary(self, date, offset=0):
+        # Prefix-sum row for a day, clipped to the calendar so out-of-range days add nothing
+        return int(np.clip((pd.Timestamp(date).normalize() - self.dates[0]).days + offset, 0, len(self.dates)))
+
+    def rollup(self, name, start=None, end=None):
+        """Rollup rows for every period that overlaps [start, end]; boundary periods are clipped to the range."""
+        if start is None and end is None:
+            return self.rollups[name]
+        first = 0 if start is None else self._boundary(start)
+        stop = len(self.dates) if end is None else self._boundary(end, 1)
+        return self._rollup(ROLLUPS[name], first, stop)
+
+    def range_totals(self, start=None, end=None):
+        """Views per status, total and subscribed share between two dates (inclusive); zero outside the data."""
+        first = 0 if start is None else self._boundary(start)
+        stop = len(self.dates) if end is None else self._boundary(end, 1)
+        sums = self._sums[max(stop, first)] - self._sums[first]
+        totals = pd.Series(sums, index=self.statuses)
+        totals["Total"] = sums.sum()
+        totals["Subscribed share (%)"] = self._share(sums)
+        return totals
@@ -0,0 +1,145 @@
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+DUPLICATE_THRESHOLD = 0.8
+
+
+class TitleSimilarity:
+    """Incremental TF-IDF index over video titles for related videos and near-duplicate clusters.
+
+    Raw term counts are kept as a sparse matrix that only grows: ``add`` tokenises
+    the titles it has not seen, extends the vocabulary and appends their rows.
+    IDF weights come from the running document frequencies, so the normalised
+    TF-IDF matrix is rebuilt from the counts in one sparse pass when it is next
+    needed instead of refitting a vectorizer over the whole catalog.
+
+    Near-duplicate pairs are kept between calls to ``duplicates``: only rows added
+    since the last call are compared against the matrix, and earlier pairs keep
+    the scores they had under the IDF weights of their own call.
+    """
+
+    def __init__(self, titles=()):
+        # Word unigrams and bigrams; English stop words would drop "Full", "Front", "Line" parts of series names
+        self._analyze = TfidfVectorizer(ngram_range=(1, 2)).build_analyzer()
+        self.titles = []
+        self._positions = {}
+        self.vocabulary = {}
+        self._document_frequency = np.zeros(0, dtype=np.int64)
+        self._counts = sparse.csr_matrix((0, 0), dtype=np.float64)
+        self._matrix = None
+        self._lock = threading.Lock()
+        self._pairs = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        self._paired_rows = 0
+        self._pair_threshold = None
+        self._pair_lock = threading.Lock()
+        self.add(titles)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __contains__(self, title):
+        return str(title).strip() in self._positions
+
+    def _count_rows(self, titles, grow):
+        rows, columns, values = [], [], []
+        for row, title in enumerate(titles):
+            terms = Counter(self._analyze(title))
+            for term, count in terms.items():
+                column = self.vocabulary.get(term)
+                if column is None:
+                    if not grow:
+                        continue
+                    column = self.vocabulary[term] = len(self.vocabulary)
+                rows.append(row)
+                columns.append(column)
+                values.append(count)
+        return sparse.csr_matrix((values, (rows, columns)), shape=(len(titles), len(self.vocabulary)))
+
+    def add(self, titles):
+        """Index titles not seen before; returns how many were added."""
+        with self._lock:
+            new = list(dict.fromkeys(title for title in (str(title).strip() for title in titles if pd.notna(title))
+                                     if title and title not in self._positions))
+            if not new:
+                return 0
+            counts = self._count_rows(new, grow=True)
+            width = len(self.vocabulary)
+            self._counts.resize((self._counts.shape[0], width))
+            self._counts = sparse.vstack([self._counts, counts], format="csr")
+            self._document_frequency = np.concatenate([
+                self._document_frequency, np.zeros(width - len(self._document_frequency), dtype=np.int64)])
+            self._document_frequency += np.bincount(counts.indices, minlength=width)
+            self._positions.update((title, len(self.titles) + offset) for offset, title in enumerate(new))
+            self.titles.extend(new)
+            self._matrix = None
+            return len(new)
+
+    def _idf(self):
+        # Smoothed IDF, as in sklearn's TfidfTransformer
+        return np.log((1 + len(self.titles)) / (1 + self._document_frequency)) + 1
+
+    @property
+    def matrix(self):
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = normalize(self._counts @ sparse.diags(self._idf()))
+            return self._matrix
+
+    def vector(self, title):
+        # Titles outside the index are projected onto the current vocabulary without being added
+        title = str(title).strip()
+        if title in self._positions:
+            return self.matrix[self._positions[title]]
+        with self._lock:
+            counts = self._count_rows([title], grow=False)
+            return normalize(counts @ sparse.diags(self._idf()))
+
+    def related(self, title, k=10, among=None):
+        """The ``k`` most similar indexed titles, excluding the title itself and any title not in ``among``."""
+        scores = (self.matrix @ self.vector(title).T).toarray().ravel()
+        if among is not None:
+            # The index outlives dataset versions, so titles dropped from the current catalog are masked out
+            allowed = np.zeros(len(scores), dtype=bool)
+            positions = [self._positions.get(str(candidate).strip()) for candidate in among if pd.notna(candidate)]
+            allowed[[position for position in positions if position is not None and position < len(scores)]] = True
+            scores[~allowed] = -1.0
+        position = self._positions.get(str(title).strip())
+        if position is not None:
+            scores[position] = -1.0
+        k = min(k, int((scores > 0).sum()))
+        top = np.argpartition(-scores, k)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")][:k]
+        return pd.DataFrame({"Video title": [self.titles[i] for i in top], "Similarity": scores[top]})
+
+    def duplicates(self, threshold=DUPLICATE_THRESHOLD):
+        """Cluster titles whose cosine similarity reaches ``threshold``; singletons are left out."""
+        with self._pair_lock:
+            matrix = self.matrix
+            rows = matrix.shape[0]
+            if threshold != self._pair_threshold:
+                self._pairs = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+                self._paired_rows = 0
+                self._pair_threshold = threshold
+            start = self._paired_rows
+            if start < rows:
+                # New rows against every row up to themselves; older pairs were found by earlier calls
+                similar = (matrix[start:] @ matrix.T).tocoo()
+                keep = (similar.data >= threshold) & (similar.col < similar.row + start)
+                self._pairs = (np.concatenate([self._pairs[0], similar.row[keep] + start]),
+                               np.concatenate([self._pairs[1], similar.col[keep]]))
+                self._paired_rows = rows
+            first, second = self._pairs
+        graph = sparse.coo_matrix((np.ones(len(first)), (first, second)), shape=(rows, rows))
+        _, labels = connected_components(graph, directed=False)
+        clusters = pd.DataFrame({"Cluster": labels, "Video title": self.titles[:rows]})
+        sizes = clusters["Cluster"].map(clusters["Cluster"].value_counts())
+        clusters = clusters[sizes > 1].reset_index(drop=True)
+        # Number clusters by first appearance so labels are stable for a given catalog
+        return clusters.assign(Cluster=pd.factorize(clusters["Cluster"])[0])
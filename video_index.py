@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+
+class VideoIndex:
+    """Title -> row-range index over a frame sorted by video title."""
+
+    def __init__(self, data, column="Video title"):
+        data = data[data[column].notna()]
+        titles = data[column].astype(str).str.strip().to_numpy()
+
+        # Sort once so every title owns a contiguous [start, stop) block of rows
+        order = np.argsort(titles, kind="stable")
+        self.frame = data.iloc[order].reset_index(drop=True)
+        sorted_titles = titles[order]
+
+        is_start = np.ones(len(sorted_titles), dtype=bool)
+        is_start[1:] = sorted_titles[1:] != sorted_titles[:-1]
+        starts = np.flatnonzero(is_start)
+        stops = np.append(starts[1:], len(sorted_titles))
+
+        self.titles = sorted_titles[starts]
+        self._ranges = dict(zip(self.titles, zip(starts.tolist(), stops.tolist())))
+        self._lowered = pd.Series(self.titles).str.lower()
+        self._searches = {}
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __contains__(self, title):
+        return str(title).strip() in self._ranges
+
+    def rows(self, title):
+        start, stop = self._ranges.get(str(title).strip(), (0, 0))
+        return self.frame.iloc[start:stop]
+
+    def search(self, query):
+        # Substring match over unique titles only; repeated queries are memoised
+        query = str(query).strip().lower()
+        if not query:
+            return self.titles
+        # Shared across session threads, so read once and return the local; another thread may clear the memo
+        matches = self._searches.get(query)
+        if matches is None:
+            matches = self.titles[self._lowered.str.contains(query, regex=False).to_numpy()]
+            if len(self._searches) >= 256:
+                self._searches.clear()
+            self._searches[query] = matches
+        return matches
+
+    def page(self, query, page=1, page_size=50):
+        matches = self.search(query)
+        page_count = max(1, -(-len(matches) // page_size))
+        page = min(max(int(page), 1), page_count)
+        start = (page - 1) * page_size
+        return matches[start:start + page_size].tolist(), len(matches), page_count
@@ -0,0 +1,118 @@
+"""Pre-fill the dashboard's caches so the first visitor gets steady-state latency.
+
+    python warmup.py && streamlit run FINAL.py
+    python warmup.py --server http://localhost:8501    # once the server is up, before it takes traffic
+
+Without ``--server``, FINAL.py runs headlessly once per category, which
+downloads and parses every dataset and renders every cached figure into
+Streamlit's on-disk cache (``persist="disk"``). A manifest records the code and
+data versions the cache was built from; the next run skips the work when both
+still match, and ``--check`` only reports whether the cache is current.
+
+The ``st.cache_resource`` objects (query engines, indexes, baselines) live in
+the server process and can only be built there, so a deployment also runs
+``--server`` against each new server: one scripted session over every tab
+builds them before the first real visitor arrives.
+"""
+import asyncio
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+import streamlit as st
+from streamlit.runtime.caching.storage.local_disk_cache_storage import LocalDiskCacheStorageManager
+from streamlit.testing.v1 import AppTest, app_test
+
+from datasets import DATA_DIR, code_version, content_version, dataset_urls, fetch
+from load_test import run_session
+
+APP_PATH = DATA_DIR / "FINAL.py"
+WARMUP_MANIFEST = DATA_DIR / "artifacts" / "warmup.json"
+
+
+def data_versions(urls):
+    return {name: content_version(fetch(url)) for name, url in urls.items()}
+
+
+def current_versions():
+    urls = dataset_urls()
+    return {"code": code_version(salt=st.__version__), "urls": urls, "data": data_versions(urls)}
+
+
+def read_manifest(path=WARMUP_MANIFEST):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def is_warm(manifest, versions):
+    return manifest is not None and all(manifest.get(key) == value for key, value in versions.items())
+
+
+def _selectbox(app, label):
+    return next((box for box in app.selectbox if box.label.startswith(label)), None)
+
+
+def warm(timeout=300.0):
+    # AppTest normally keeps st.cache_data in memory; give it the server's disk storage instead
+    LocalDiskCacheStorageManager().clear_all()
+    with mock.patch.object(app_test, "MemoryCacheStorageManager", LocalDiskCacheStorageManager):
+        app = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        app.run()
+        runs = 1
+        # Each category renders its own cached top-videos view
+        category = _selectbox(app, "Select a Category")
+        for index in range(1, len(category.options) if category else 0):
+            _selectbox(app, "Select a Category").select_index(index)
+            app.run()
+            runs += 1
+    errors = [exception.value for exception in app.exception] + [error.value for error in app.error]
+    return runs, errors
+
+
+def warm_server(url, timeout=300.0):
+    # One scripted session on the running server builds its in-process resource caches
+    stream = url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+    latencies, errors = asyncio.run(run_session(stream, 0, 1, timeout, 0))
+    return len(latencies), errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Only report whether the cache is current.")
+    parser.add_argument("--force", action="store_true", help="Rebuild even when the manifest matches.")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds allowed per app run.")
+    parser.add_argument("--server", help="URL of a running server whose resource caches should be built.")
+    args = parser.parse_args(argv)
+
+    if args.server:
+        started = time.perf_counter()
+        runs, errors = warm_server(args.server, args.timeout)
+        print(f"Warmed {args.server} with {runs} reruns in {time.perf_counter() - started:.1f}s ({errors} errors)")
+        return 1 if errors else 0
+
+    versions = current_versions()
+    manifest = read_manifest()
+    if args.check or (is_warm(manifest, versions) and not args.force):
+        state = "current" if is_warm(manifest, versions) else "stale"
+        print(f"Warm cache is {state} (code {versions['code']})")
+        return 0 if state == "current" else 1
+
+    started = time.perf_counter()
+    runs, errors = warm(args.timeout)
+    if errors:
+        print("Warm-up failed:", *errors, sep="\n  ", file=sys.stderr)
+        return 1
+
+    WARMUP_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    WARMUP_MANIFEST.write_text(json.dumps({**versions, "warmed_at": time.time()}, indent=2))
+    print(f"Warmed {runs} app runs in {time.perf_counter() - started:.1f}s (code {versions['code']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())